@@ -1,22 +1,79 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 from datetime import datetime
 import pytz
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
+import codecs
+import gzip
+import hashlib
+import itertools
 import json
+import logging
+import os
+import sqlite3
+import time
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from io import BytesIO
+import xlsxwriter
 
 # Work in Remote
+GITHUB_API_URL = "https://api.github.com"  # Overridden by the GITHUB_API_URL secret, e.g. for a local stand-in
 REPOSITORY = "fajarnadril/Employee-Attendance"
 BRANCH = "main"
 FILE_PATHS = {
     "attendance": "database/EmployeeAbsent.json",
-    "employee": "database/EmployeeData.json"
+    "employee": "database/EmployeeData.json",
+    "attendance_events": "database/attendance_events",
+    "attendance_partitions": "database/attendance",
+    "attendance_summary": "database/attendance_summary",
+    "signatures": "database/Signatures.json"
 }
+STORAGE_BACKEND = "github"  # "github" keeps JSON files in REPOSITORY, "sqlite" uses a local database
+SQLITE_PATH = "database/attendance.db"
+SITES = {}  # Site name -> GitHub repository ("owner/name") or SQLite database path (".db") for the All Sites report;
+# e.g. {"Jakarta": "fajarnadril/Employee-Attendance", "Surabaya": "org/attendance-surabaya"}. Empty hides the report.
 TIMEZONE = 'Asia/Jakarta'
 DASHBOARD_PIN = "357101"
 ADMIN_PIN = "357101"  # Using the same PIN for both Dashboard and Admin access
+GITHUB_CACHE_TTL = 30  # Seconds a fetched file is reused before GitHub is asked again
+GITHUB_TIMEOUT = (5, 30)  # Seconds to connect and to wait for a response on each API call
+GITHUB_RETRIES = 3  # Retries of a GET answered with 429 or a 5xx
+GITHUB_RETRY_BACKOFF = 0.5  # Seconds before the first retry, doubling after each one
+GITHUB_POOL_SIZE = 8  # Kept-alive connections, and files fetched at the same time
+GITHUB_INLINE_LIMIT = 1_000_000  # Bytes up to which the contents API returns and accepts a file inline
+GITHUB_STREAM_CHUNK = 1 << 20  # Bytes read at a time while streaming a large file
+ATTENDANCE_STORAGE = "snapshot"  # "snapshot" rewrites the whole file, "events" appends to log segments,
+                                 # "monthly" keeps one file per month under database/attendance
+EVENT_LOG_SEGMENT = "%Y-%m-%d"  # One segment file per day; use "%Y-%m-%d-%H" for hourly segments
+EVENT_LOG_COMPACT_AFTER = 14  # Closed segments allowed before they are folded into the snapshot
+ATTENDANCE_FORMAT = "json"  # Format new attendance files are written in: "json" (indented records), "columnar"
+                                # (compact header + rows), "gzip" (gzipped columnar) or "parquet" (needs pyarrow)
+ATTENDANCE_FORMATS = ["json", "columnar", "gzip", "parquet"]  # Formats offered by Convert Attendance Files
+ATTENDANCE_COLUMNS = ["Date", "EmployeeID", "ClockIn", "ClockOut", "DailyLog"]
+EMPLOYEE_COLUMNS = ["EmployeeID", "Name", "Department"]
+SUMMARY_COLUMNS = ["EmployeeID", "Month", "DaysAttended", "DaysLogged", "FirstSeen", "LastSeen", "HoursWorked"]
+SIGNATURE_COLUMNS = ["EmployeeID", "Start", "End"]
+SIGNATURE_TEXT = "Disetujui & Ditandatangi elektronik oleh : Site Supervisor via Sistem clockin.streamlit.app"
+EXCEL_COLUMN_WIDTHS = {"Site": 16, "Date": 12, "Period": 12, "EmployeeID": 14, "Name": 30, "Department": 16, "ClockIn": 10, "ClockOut": 10, "DailyLog": 60, "Sign": 45}
+SHIFT_START = "09:00:00"  # Scheduled start of the working day, for lateness
+SHIFT_END = "17:00:00"  # Scheduled end of the working day, for early leave and overtime
+TIMESHEET_ROUNDING_MINUTES = 15  # Granularity worked time is rounded to
+EXCEL_CHUNK_ROWS = 5000  # Rows converted at a time while streaming a sheet
+WRITE_COALESCE_WINDOW = 0.5  # Seconds the first queued attendance write waits for others to join its commit
+WRITE_RETRIES = 3  # Attempts before a batch that keeps hitting sha conflicts is reported as failed
+PERF_HISTORY = 200  # Reruns (and calls per step) kept for the performance panel
+KIOSK_MODE = False  # Acknowledge clock-ins and clock-outs once they are in a local queue, and sync them in the background
+KIOSK_QUEUE_PATH = "database/kiosk_queue.jsonl"  # Write-ahead queue of punches not yet in the backing store
+KIOSK_FLUSH_INTERVAL = 5  # Seconds between attempts to push queued punches while they keep failing
+EMPLOYEE_SEARCH_LIMIT = 50  # Employees offered by a search box at a time
 
 def get_current_time():
     """Get current date and time in Jakarta timezone."""
@@ -24,52 +81,2266 @@ def get_current_time():
     current_time = datetime.now(timezone)
     return current_time.strftime('%d/%m/%Y'), current_time.strftime('%H:%M:%S')
 
-def fetch_github_json(filepath):
-    """Fetch JSON file from GitHub repository."""
+# === Performance Tracing ===
+# Expensive steps run inside perf_span(), which times them, counts the bytes
+# and GitHub API calls they cost and writes a JSON log line. Spans are also
+# added to the running rerun's trace, and each finished trace is filed under
+# its page and action in a rolling, process-wide history that the Manage User
+# page summarizes as p50/p95.
+
+@st.cache_resource
+def get_perf_state():
+    """Process-wide performance history and the trace running on each script thread."""
+    logger = logging.getLogger("attendance.perf")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return {"lock": threading.Lock(), "local": threading.local(), "reruns": {}, "spans": {}, "logger": logger}
+
+@contextmanager
+def perf_span(name, **fields):
+    """Time a step; the caller may set the yielded span's "bytes" and "calls"."""
+    state = get_perf_state()
+    span = {"bytes": 0, "calls": 0, **fields}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        end = time.perf_counter()
+        span = {"event": "span", "span": name, "ms": round((end - start) * 1000, 1), **span}
+        trace = getattr(state["local"], "trace", None)
+        if trace is not None:
+            span.update(page=trace["page"], action=trace["action"])
+            trace["spans"].append(span)
+            trace["end"] = end
+        with state["lock"]:
+            state["spans"].setdefault(name, deque(maxlen=PERF_HISTORY)).append(span["ms"])
+        state["logger"].info(json.dumps(span, default=str))
+
+def start_perf_trace(page):
+    """Start the trace of this rerun.
+
+    A previous trace of the session that st.rerun() or st.stop() cut short is
+    filed first, ending at its last span; one without spans is dropped.
+    """
+    previous = st.session_state.get("perf_trace")
+    if previous is not None and not previous["filed"] and previous["end"] is not None:
+        file_perf_trace(previous)
+    trace = {"page": page, "action": "view", "start": time.perf_counter(), "end": None, "spans": [], "filed": False}
+    st.session_state.perf_trace = trace
+    get_perf_state()["local"].trace = trace
+
+def set_perf_action(action):
+    """Name the user action this rerun performs, e.g. "clock_in"."""
+    trace = getattr(get_perf_state()["local"], "trace", None)
+    if trace is not None:
+        trace["action"] = action
+
+def finish_perf_trace():
+    """File the trace of a rerun that ran to the end of the script."""
+    state = get_perf_state()
+    trace = getattr(state["local"], "trace", None)
+    if trace is not None:
+        trace["end"] = time.perf_counter()
+        file_perf_trace(trace)
+        state["local"].trace = None
+
+def file_perf_trace(trace):
+    """Add a trace's totals to the rolling history and log them."""
+    state = get_perf_state()
+    trace["filed"] = True
+    rerun = {
+        "event": "rerun",
+        "page": trace["page"],
+        "action": trace["action"],
+        "ms": round((trace["end"] - trace["start"]) * 1000, 1),
+        "bytes": sum(span["bytes"] for span in trace["spans"]),
+        "calls": sum(span["calls"] for span in trace["spans"])
+    }
+    with state["lock"]:
+        state["reruns"].setdefault((trace["page"], trace["action"]), deque(maxlen=PERF_HISTORY)).append(rerun)
+    state["logger"].info(json.dumps(rerun))
+
+def perf_summary():
+    """(reruns, steps) frames with run counts and p50/p95 durations from the rolling history."""
+    state = get_perf_state()
+    with state["lock"]:
+        reruns = {key: list(history) for key, history in state["reruns"].items()}
+        spans = {name: list(history) for name, history in state["spans"].items()}
+
+    rerun_rows = []
+    for (page, action), history in sorted(reruns.items()):
+        durations = pd.Series([rerun["ms"] for rerun in history])
+        rerun_rows.append({
+            "Page": page,
+            "Action": action,
+            "Runs": len(history),
+            "p50 ms": round(durations.quantile(0.5), 1),
+            "p95 ms": round(durations.quantile(0.95), 1),
+            "Avg KB": round(sum(rerun["bytes"] for rerun in history) / len(history) / 1024, 1),
+            "Avg API Calls": round(sum(rerun["calls"] for rerun in history) / len(history), 1)
+        })
+    step_rows = [
+        {"Step": name, "Runs": len(durations), "p50 ms": round(durations.quantile(0.5), 1), "p95 ms": round(durations.quantile(0.95), 1)}
+        for name, durations in ((name, pd.Series(history)) for name, history in sorted(spans.items()))
+    ]
+    return pd.DataFrame(rerun_rows), pd.DataFrame(step_rows)
+
+@st.cache_resource
+def get_github_repository_state():
+    """Per-thread GitHub state: the repository each thread works on, when
+    github_repository() points it away from REPOSITORY, and how many of its
+    reads GitHub could not answer."""
+    return threading.local()
+
+def count_failed_github_read():
+    state = get_github_repository_state()
+    state.failed_reads = failed_github_reads() + 1
+
+def failed_github_reads():
+    """Reads on this thread that were served from the cache, or came back empty, because GitHub was unavailable."""
+    return getattr(get_github_repository_state(), "failed_reads", 0)
+
+def current_repository():
+    return getattr(get_github_repository_state(), "repository", None) or REPOSITORY
+
+@contextmanager
+def github_repository(repository):
+    """Point this thread's GitHub reads and writes, and its file cache, at another repository."""
+    state = get_github_repository_state()
+    previous = getattr(state, "repository", None)
+    state.repository = repository
+    try:
+        yield
+    finally:
+        state.repository = previous
+
+def github_repository_url(endpoint):
+    """API URL of an endpoint under the current repository, e.g. "git/blobs"."""
+    return f"{st.secrets.get('GITHUB_API_URL', GITHUB_API_URL)}/repos/{current_repository()}/{endpoint}"
+
+def github_contents_url(path):
+    """Contents API URL of a path in the current repository."""
+    return github_repository_url(f"contents/{path}")
+
+@st.cache_resource
+def get_github_session():
+    """Process-wide pooled session for the GitHub API.
+
+    Connections are kept alive across sessions. GETs answered with 429 or a
+    5xx are retried with backoff; writes are not, since a repeated PUT may
+    land on a sha it already changed.
+    """
+    retry = Retry(
+        total=GITHUB_RETRIES,
+        backoff_factor=GITHUB_RETRY_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=GITHUB_POOL_SIZE, pool_maxsize=GITHUB_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_github_pool():
+    """Process-wide thread pool for fetching independent files at the same time."""
+    return ThreadPoolExecutor(max_workers=GITHUB_POOL_SIZE, thread_name_prefix="github-fetch")
+
+def github_request(method, url, span, **kwargs):
+    """Send one API request through the pooled session, recording it on span. None when it failed to complete.
+
+    With ``stream=True`` the body is left unread for the caller to consume
+    (and count).
+    """
+    try:
+        response = get_github_session().request(method, url, timeout=GITHUB_TIMEOUT, **kwargs)
+    except requests.RequestException as error:
+        span["error"] = type(error).__name__
+        return None
+    received = 0 if kwargs.get("stream") else len(response.content)
+    span.update(bytes=span["bytes"] + received, calls=span["calls"] + 1, status=response.status_code)
+    return response
+
+def github_git_request(method, endpoint, span, **kwargs):
+    """Call a Git data API endpoint. Returns the decoded JSON, or None unless it answered 200/201."""
+    headers = {"Authorization": f"token {st.secrets['GITHUB_TOKEN']}", "Accept": "application/vnd.github+json"}
+    response = github_request(method, github_repository_url(endpoint), span, headers=headers, **kwargs)
+    if response is None or response.status_code not in [200, 201]:
+        return None
+    return response.json()
+
+def parse_json_stream(chunks):
+    """Parse a JSON document arriving as byte chunks.
+
+    A top-level array is decoded one element at a time, so only the parsed
+    items and about one chunk of text are held, never the whole text next
+    to the parsed list. Anything else is joined and parsed in one go.
+    """
+    chunks = iter(chunks)
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    while not buffer.strip():
+        chunk = next(chunks, None)
+        if chunk is None:
+            return json.loads(buffer + text.decode(b"", final=True))
+        buffer += text.decode(chunk)
+    buffer = buffer.lstrip()
+    if not buffer.startswith("["):
+        return json.loads(buffer + "".join(text.decode(chunk) for chunk in chunks) + text.decode(b"", final=True))
+
+    decoder = json.JSONDecoder()
+    items, position, exhausted = [], 1, False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return items
+        if position < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if exhausted:
+                    raise
+            else:
+                # A number may continue in the next chunk ("7." then "25"), so while
+                # chunks remain an item counts only once a "," or "]" follows it
+                following = end
+                while following < len(buffer) and buffer[following] in " \t\r\n":
+                    following += 1
+                if exhausted or (following < len(buffer) and buffer[following] in ",]"):
+                    items.append(item)
+                    position = end
+                    continue
+        if exhausted:
+            raise ValueError("Unterminated JSON array")
+        buffer, position = buffer[position:], 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text.decode(b"", final=True)
+        else:
+            buffer += text.decode(chunk)
+
+def stream_github_blob(filepath, blob_sha):
+    """Download a blob raw through the Git data API, parsing it as it streams in. Returns (data, format), or None.
+
+    Used for files above GITHUB_INLINE_LIMIT, whose content the contents API
+    leaves out.
+    """
+    headers = {"Authorization": f"token {st.secrets['GITHUB_TOKEN']}", "Accept": "application/vnd.github.raw"}
+    url = github_repository_url(f"git/blobs/{blob_sha}")
+
+    with perf_span("github.blob", path=filepath) as span:
+        response = github_request("GET", url, span, headers=headers, stream=True)
+        if response is None:
+            return None
+        try:
+            if response.status_code != 200:
+                return None
+
+            def counted(chunks):
+                for chunk in chunks:
+                    span["bytes"] += len(chunk)
+                    yield chunk
+
+            chunks = counted(response.iter_content(GITHUB_STREAM_CHUNK))
+            first = next(chunks, b"")
+            file_format = content_format(first)
+            if file_format == "parquet":
+                return decode_github_content(first + b"".join(chunks))
+            if file_format == "gzip":
+                # Decompressed as it arrives, so the compressed and the full text never sit side by side
+                inflate = zlib.decompressobj(wbits=31)
+                chunks = (inflate.decompress(chunk) for chunk in chunks)
+                first = inflate.decompress(first)
+            return from_columnar(parse_json_stream(itertools.chain([first], chunks))), file_format
+        except (requests.RequestException, ValueError) as error:
+            span["error"] = type(error).__name__
+            return None
+        finally:
+            response.close()
+
+def encode_github_content(data, file_format="json"):
+    """Serialize data for storage as file_format. Only lists of records are stored column-wise.
+
+    "columnar" keeps every key once instead of once per record and drops the
+    indentation, which are most of the bytes of an indented records file. It
+    is still a top-level array, a {"columns": [...]} header followed by one
+    array per record, so parse_json_stream decodes it row by row.
+    """
+    if file_format == "json":
+        return json.dumps(data, indent=2).encode()
+    if file_format == "parquet":
+        buffer = BytesIO()
+        pd.DataFrame(data).to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    if isinstance(data, list) and data and all(isinstance(record, dict) for record in data):
+        columns = list(dict.fromkeys(key for record in data for key in record))
+        data = [{"columns": columns}, *([record.get(column) for column in columns] for record in data)]
+    content = json.dumps(data, separators=(",", ":")).encode()
+    return gzip.compress(content, mtime=0) if file_format == "gzip" else content
+
+def from_columnar(data):
+    """Records of a decoded "columnar" document; any other JSON is returned as is.
+
+    Files written before the header row, as a {"columns", "rows"} object, are
+    still read.
+    """
+    if isinstance(data, dict) and data.keys() == {"columns", "rows"}:
+        columns = data["columns"]
+        return [dict(zip(columns, row)) for row in data["rows"]]
+    if isinstance(data, list) and data and isinstance(data[0], dict) and data[0].keys() == {"columns"}:
+        columns = data[0]["columns"]
+        return [dict(zip(columns, row)) for row in itertools.islice(data, 1, None)]
+    return data
+
+def content_format(content):
+    """Detect the format of stored bytes from their leading bytes."""
+    if content[:2] == b"\x1f\x8b":
+        return "gzip"
+    if content[:4] == b"PAR1":
+        return "parquet"
+    head = content.lstrip()[:64]
+    return "columnar" if head[:1] in (b"{", b"[") and b'"columns"' in head else "json"
+
+def decode_github_content(content):
+    """Parse stored bytes in any supported format, detected from the content. Returns (data, format)."""
+    file_format = content_format(content)
+    if file_format == "parquet":
+        return dataframe_to_records(pd.read_parquet(BytesIO(content))), file_format
+    if file_format == "gzip":
+        content = gzip.decompress(content)
+    return from_columnar(json.loads(content)), file_format
+
+@st.cache_resource
+def get_github_caches():
+    """Process-wide caches of fetched GitHub files, one per repository, shared by every session."""
+    return {}
+
+def get_github_cache():
+    """The file cache of the current repository."""
+    return get_github_caches().setdefault(current_repository(), {})
+
+def stale_github_file(filepath):
+    """The cached copy of a file GitHub could not be asked about, as (data, sha); ([], None) if there is none."""
+    count_failed_github_read()
+    cached = get_github_cache().get(filepath)
+    if not cached:
+        return [], None
+    logging.getLogger("attendance.storage").warning("GitHub unavailable, serving the cached copy of %s", filepath)
+    cached["checked_at"] = time.monotonic()
+    return cached["data"], cached["sha"]
+
+def fetch_github_json(filepath, fresh=False):
+    """Fetch JSON file from GitHub repository.
+
+    Any format written by encode_github_content is read, detected from the
+    content. Files are cached by path. Within GITHUB_CACHE_TTL the cached copy is
+    returned without a request; after that (or always, when ``fresh`` is set)
+    a conditional request is sent and a 304 (or an unchanged sha) reuses the
+    already-decoded data. When GitHub cannot be reached or answers 429 or 5xx,
+    the cached copy keeps being served for another GITHUB_CACHE_TTL; a write
+    based on it is still rejected by GitHub if the file moved on meanwhile.
+
+    A file this process wrote last is not fetched again before the next
+    write: that write is checked against its sha anyway, and once a write
+    based on the copy fails, the file is read from GitHub again.
+    """
+    cache = get_github_cache()
+    cached = cache.get(filepath)
+    if cached and not fresh and time.monotonic() - cached["checked_at"] < GITHUB_CACHE_TTL:
+        return cached["data"], cached["sha"]
+    if cached and fresh and cached.get("written"):
+        return cached["data"], cached["sha"]
+
     token = st.secrets["GITHUB_TOKEN"]
     headers = {"Authorization": f"token {token}"}
-    url = f"https://api.github.com/repos/{REPOSITORY}/contents/{filepath}"
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    url = github_contents_url(filepath)
     
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        content_sha = response.json()["sha"]
-        content_data = base64.b64decode(response.json()["content"]).decode()
-        return json.loads(content_data), content_sha
+    with perf_span("github.fetch", path=filepath) as span:
+        response = github_request("GET", url, span, headers=headers)
+    if response is None or response.status_code == 429 or response.status_code >= 500:
+        return stale_github_file(filepath)
+    elif response.status_code == 304 and cached:
+        cached["checked_at"] = time.monotonic()
+        return cached["data"], cached["sha"]
+    elif response.status_code == 200:
+        payload = response.json()
+        content_sha = payload["sha"]
+        if cached and cached["sha"] == content_sha:
+            cached["etag"] = response.headers.get("ETag")
+            cached["checked_at"] = time.monotonic()
+            return cached["data"], content_sha
+        if payload.get("encoding") == "none":
+            # Over GITHUB_INLINE_LIMIT the content is left out and has to be downloaded as a blob
+            streamed = stream_github_blob(filepath, content_sha)
+            if streamed is None:
+                return stale_github_file(filepath)
+            data, file_format = streamed
+        else:
+            with perf_span("json.decode", path=filepath):
+                data, file_format = decode_github_content(base64.b64decode(payload["content"]))
+        cache[filepath] = {
+            "sha": content_sha,
+            "etag": response.headers.get("ETag"),
+            "data": data,
+            "format": file_format,
+            "frames": {},
+            "checked_at": time.monotonic()
+        }
+        return data, content_sha
     else:
         return [], None
 
-def update_github_json(filepath, data, content_sha):
-    """Update JSON file in GitHub repository."""
+def map_in_context(pool, function, items):
+    """pool.map() whose workers share the caller's script context, performance trace and repository.
+
+    Reads GitHub could not answer in the workers count as the caller's.
+    """
+    context = get_script_run_ctx(suppress_warning=True)
+    trace = getattr(get_perf_state()["local"], "trace", None)
+    repository = current_repository()
+    failed_reads = []
+
+    def run(item):
+        add_script_run_ctx(threading.current_thread(), context)
+        get_perf_state()["local"].trace = trace
+        before = failed_github_reads()
+        try:
+            with github_repository(repository):
+                return function(item)
+        finally:
+            failed_reads.append(failed_github_reads() - before)
+            get_perf_state()["local"].trace = None
+
+    results = list(pool.map(run, items))
+    get_github_repository_state().failed_reads = failed_github_reads() + sum(failed_reads)
+    return results
+
+def fetch_github_files(filepaths, fresh_paths=()):
+    """Fetch several files concurrently into the cache; paths in fresh_paths skip the TTL. Returns {path: (data, sha)}."""
+    results = map_in_context(get_github_pool(), lambda filepath: fetch_github_json(filepath, fresh=filepath in fresh_paths), filepaths)
+    return dict(zip(filepaths, results))
+
+def load_github_dataframe(filepath, columns=None, fresh=False):
+    """Fetch a JSON file as a DataFrame, reusing the parsed frame while its sha is unchanged."""
+    data, content_sha = fetch_github_json(filepath, fresh=fresh)
+    cached = get_github_cache().get(filepath)
+    frames = cached["frames"] if cached and cached["sha"] == content_sha else {}
+
+    if "frame" not in frames:
+        with perf_span("frame.build", path=filepath):
+            frame = pd.DataFrame(data)
+            if frame.empty and columns:
+                frame = pd.DataFrame(columns=columns)
+        frames["frame"] = frame
+    # Callers edit their frame in place, so never hand out the cached one
+    return frames["frame"].copy(), content_sha
+
+def dataframe_to_records(frame):
+    """Convert a DataFrame to JSON-ready records, writing missing values as null."""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+def invalidate_github_cache(filepath):
+    """Drop a cached file so the next fetch reads it from GitHub."""
+    get_github_cache().pop(filepath, None)
+
+def git_blob_sha(content):
+    """The sha git gives a blob of these bytes, as the contents API reports it."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+def commit_github_files(files):
+    """Commit files through the Git data API as one commit: tree, commit, then a branch update.
+
+    files maps each path to (content bytes, content_sha). Like a contents API
+    PUT, the commit only lands if every file at the branch head still has its
+    content_sha (None for a new file), and the branch update is not forced,
+    so a commit pushed in the meantime fails it too. The shas at the head are
+    read from one recursive tree listing. Text up to GITHUB_INLINE_LIMIT goes
+    inline in the new tree; other files are uploaded as blobs first, at the
+    same time as the listing. Returns {path: new blob sha}, or None.
+    """
+    with perf_span("github.commit", path=", ".join(files)) as span:
+        span["bytes"] = sum(len(content) for content, _ in files.values())
+        ref = github_git_request("GET", f"git/ref/heads/{BRANCH}", span)
+        if ref is None:
+            return None
+        head_sha = ref["object"]["sha"]
+
+        def tree_entry(filepath, part):
+            content = files[filepath][0]
+            entry = {"path": filepath, "mode": "100644", "type": "blob"}
+            try:
+                text = content.decode()
+            except UnicodeDecodeError:
+                blob_body = {"content": base64.b64encode(content).decode(), "encoding": "base64"}
+            else:
+                if len(content) <= GITHUB_INLINE_LIMIT:
+                    return {**entry, "content": text}
+                blob_body = {"content": text, "encoding": "utf-8"}
+            blob = github_git_request("POST", "git/blobs", part, json=blob_body)
+            return None if blob is None else {**entry, "sha": blob["sha"]}
+
+        # Each request records on its own part, added to the span once they are all done
+        tasks = [lambda part: github_git_request("GET", f"git/trees/{head_sha}?recursive=1", part)]
+        tasks += [lambda part, filepath=filepath: tree_entry(filepath, part) for filepath in files]
+        parts = [{"bytes": 0, "calls": 0} for _ in tasks]
+        head_tree, *entries = map_in_context(get_github_pool(), lambda task: task[0](task[1]), list(zip(tasks, parts)))
+        span.update(bytes=span["bytes"] + sum(part["bytes"] for part in parts), calls=span["calls"] + sum(part["calls"] for part in parts))
+        if head_tree is None or head_tree.get("truncated") or None in entries:
+            return None
+        head_shas = {entry["path"]: entry["sha"] for entry in head_tree["tree"] if entry["type"] == "blob"}
+        if any(head_shas.get(filepath) != content_sha for filepath, (_, content_sha) in files.items()):
+            return None
+
+        tree = github_git_request("POST", "git/trees", span, json={
+            "base_tree": head_tree["sha"],
+            "tree": entries
+        })
+        if tree is None:
+            return None
+        commit = github_git_request("POST", "git/commits", span, json={
+            "message": f"Update {', '.join(files)} {datetime.now().isoformat()}",
+            "tree": tree["sha"],
+            "parents": [head_sha]
+        })
+        if commit is None:
+            return None
+        moved = github_git_request("PATCH", f"git/refs/heads/{BRANCH}", span, json={"sha": commit["sha"], "force": False})
+        return {filepath: git_blob_sha(content) for filepath, (content, _) in files.items()} if moved is not None else None
+
+def commit_github_file(filepath, content, content_sha):
+    """Commit one file through the Git data API, used above GITHUB_INLINE_LIMIT. Returns the new blob sha, or None."""
+    blob_shas = commit_github_files({filepath: (content, content_sha)})
+    return None if blob_shas is None else blob_shas[filepath]
+
+def cache_written_github_file(filepath, data, file_format, content_sha):
+    """What was just written is the newest version, so cache it instead of downloading it again."""
+    get_github_cache()[filepath] = {
+        "sha": content_sha,
+        "etag": None,
+        "data": data,
+        "format": file_format,
+        "frames": {},
+        "checked_at": time.monotonic(),
+        "written": True
+    }
+    update_github_listing(filepath, content_sha)
+
+def distrust_github_file(filepath):
+    """After a failed write, read the file from GitHub again before the next one."""
+    cached = get_github_cache().get(filepath)
+    if cached:
+        cached.pop("written", None)
+
+def update_github_json(filepath, data, content_sha, file_format="json"):
+    """Update JSON file in GitHub repository, stored as file_format.
+
+    Files above GITHUB_INLINE_LIMIT are committed through the Git data API.
+    """
     token = st.secrets["GITHUB_TOKEN"]
     headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
-    url = f"https://api.github.com/repos/{REPOSITORY}/contents/{filepath}"
-    
-    content = json.dumps(data, indent=2)
-    encoded_content = base64.b64encode(content.encode()).decode()
+    url = github_contents_url(filepath)
     
+    content = encode_github_content(data, file_format)
+    if len(content) > GITHUB_INLINE_LIMIT:
+        new_sha = commit_github_file(filepath, content, content_sha)
+    else:
+        encoded_content = base64.b64encode(content).decode()
+        
+        payload = {
+            "message": f"Update {filepath} {datetime.now().isoformat()}",
+            "content": encoded_content,
+            "branch": BRANCH,
+            "sha": content_sha
+        }
+        
+        body = json.dumps(payload)
+        with perf_span("github.put", path=filepath) as span:
+            span["bytes"] = len(body)
+            response = github_request("PUT", url, span, headers=headers, data=body)
+        ok = response is not None and response.status_code in [200, 201]
+        new_sha = response.json()["content"]["sha"] if ok else None
+    if new_sha is not None:
+        cache_written_github_file(filepath, data, file_format, new_sha)
+        return True
+    distrust_github_file(filepath)
+    return False
+
+def write_github_files(updates):
+    """Write several files in one commit. updates are (filepath, data, content_sha, file_format); True when it landed.
+
+    A single file is written with update_github_json().
+    """
+    if len(updates) == 1:
+        return update_github_json(*updates[0])
+    blob_shas = commit_github_files({
+        filepath: (encode_github_content(data, file_format), content_sha)
+        for filepath, data, content_sha, file_format in updates
+    })
+    if blob_shas is None:
+        for filepath, *_ in updates:
+            distrust_github_file(filepath)
+        return False
+    for filepath, data, _, file_format in updates:
+        cache_written_github_file(filepath, data, file_format, blob_shas[filepath])
+    return True
+
+def list_github_directory(dirpath, fresh=False):
+    """List the files in a GitHub repository directory, oldest name first.
+
+    Like a file, the listing is reused for GITHUB_CACHE_TTL unless ``fresh``
+    is set, and this process's own writes and deletes are applied to it.
+    """
+    cache = get_github_cache()
+    cached = cache.get(f"{dirpath}/")
+    if cached and not fresh and time.monotonic() - cached["checked_at"] < GITHUB_CACHE_TTL:
+        return list(cached["items"])
+
+    token = st.secrets["GITHUB_TOKEN"]
+    headers = {"Authorization": f"token {token}"}
+    url = github_contents_url(dirpath)
+
+    with perf_span("github.list", path=dirpath) as span:
+        response = github_request("GET", url, span, headers=headers)
+    if response is not None and response.status_code == 200 and isinstance(response.json(), list):
+        items = sorted(
+            ({"name": item["name"], "path": item["path"], "sha": item["sha"]}
+             for item in response.json() if item["type"] == "file"),
+            key=lambda item: item["name"]
+        )
+        cache[f"{dirpath}/"] = {"items": items, "checked_at": time.monotonic()}
+        return list(items)
+    elif response is None or response.status_code == 429 or response.status_code >= 500:
+        # Like files, the cached listing is served while GitHub is unavailable
+        count_failed_github_read()
+        if not cached:
+            return []
+        cached["checked_at"] = time.monotonic()
+        return list(cached["items"])
+    else:
+        return []
+
+def update_github_listing(filepath, content_sha):
+    """Apply a write (or, with content_sha None, a delete) of a file to its directory's cached listing."""
+    dirpath, name = filepath.rsplit("/", 1)
+    cached = get_github_cache().get(f"{dirpath}/")
+    if cached:
+        items = [item for item in cached["items"] if item["path"] != filepath]
+        if content_sha is not None:
+            items.append({"name": name, "path": filepath, "sha": content_sha})
+        cached["items"] = sorted(items, key=lambda item: item["name"])
+
+def delete_github_file(filepath, content_sha):
+    """Delete a file from GitHub repository."""
+    token = st.secrets["GITHUB_TOKEN"]
+    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
+    url = github_contents_url(filepath)
+
     payload = {
-        "message": f"Update {filepath} {datetime.now().isoformat()}",
-        "content": encoded_content,
+        "message": f"Delete {filepath} {datetime.now().isoformat()}",
         "branch": BRANCH,
         "sha": content_sha
     }
-    
-    response = requests.put(url, headers=headers, data=json.dumps(payload))
-    return response.status_code in [200, 201]
 
-# === UI Setup ===
-st.set_page_config(page_title="Employee Attendance System", layout="centered")
+    with perf_span("github.delete", path=filepath) as span:
+        response = github_request("DELETE", url, span, headers=headers, data=json.dumps(payload))
+    if response is not None and response.status_code == 200:
+        invalidate_github_cache(filepath)
+        update_github_listing(filepath, None)
+        return True
+    return False
 
-# Load application data
-current_date, current_time = get_current_time()
-attendance_data, attendance_sha = fetch_github_json(FILE_PATHS["attendance"])
-attendance_df = pd.DataFrame(attendance_data)
-if attendance_df.empty:
-    attendance_df = pd.DataFrame(columns=["Date", "EmployeeID", "ClockIn", "ClockOut", "DailyLog"])
+# === Attendance Model ===
+# Files and SQLite store dates as DD/MM/YYYY, times as HH:MM:SS and IDs as
+# strings. In memory attendance is converted once per load into typed columns
+# (datetime64 Date, timedelta64 ClockIn/ClockOut, categorical EmployeeID), so
+# filters and merges are vectorized and nothing is parsed again per click.
+# attendance_records() turns the typed frame back into the stored format.
+
+def to_attendance_model(records_df):
+    """Convert attendance in the stored string format into typed columns."""
+    return pd.DataFrame({
+        "Date": pd.to_datetime(records_df["Date"], format="%d/%m/%Y").astype("datetime64[s]"),
+        "EmployeeID": records_df["EmployeeID"].astype(str).astype("category"),
+        "ClockIn": pd.to_timedelta(records_df["ClockIn"].astype(object)).astype("timedelta64[s]"),
+        "ClockOut": pd.to_timedelta(records_df["ClockOut"].astype(object)).astype("timedelta64[s]"),
+        "DailyLog": records_df["DailyLog"].astype(object)
+    }, index=records_df.index)
+
+def format_clock_times(times):
+    """Format a timedelta column as HH:MM:SS strings."""
+    return (pd.Timestamp(0) + times).dt.strftime("%H:%M:%S")
+
+def format_attendance(attendance_df):
+    """Render the typed columns of a frame back as the stored strings; other columns are kept."""
+    formatted_df = attendance_df.copy()
+    formatted_df["Date"] = attendance_df["Date"].dt.strftime("%d/%m/%Y")
+    formatted_df["EmployeeID"] = attendance_df["EmployeeID"].astype(str)
+    formatted_df["ClockIn"] = format_clock_times(attendance_df["ClockIn"])
+    formatted_df["ClockOut"] = format_clock_times(attendance_df["ClockOut"])
+    return formatted_df
+
+def attendance_records(attendance_df):
+    """Convert a typed attendance frame back to stored records."""
+    return dataframe_to_records(format_attendance(attendance_df[ATTENDANCE_COLUMNS]))
+
+def empty_attendance():
+    """A typed attendance frame with no records."""
+    return to_attendance_model(pd.DataFrame(columns=ATTENDANCE_COLUMNS))
+
+def to_employee_model(records_df):
+    """Give employee data string IDs and a categorical Department."""
+    employee_df = records_df.copy()
+    employee_df["EmployeeID"] = employee_df["EmployeeID"].astype(str)
+    employee_df["Department"] = employee_df["Department"].astype("category")
+    return employee_df
+
+def day_timestamp(date):
+    """Midnight Timestamp for a date or (timezone-aware) datetime, comparable with the Date column."""
+    return pd.Timestamp(date).tz_localize(None).normalize() if isinstance(date, datetime) else pd.Timestamp(date)
+
+# === Attendance Storage ===
+# In "snapshot" mode every change rewrites database/EmployeeAbsent.json. In
+# "events" mode a change is appended as a small event to the current log
+# segment, readers fold the segments over the snapshot, and compaction
+# periodically rewrites the snapshot and removes the folded segments. In
+# "monthly" mode records are sharded into database/attendance/YYYY-MM.json
+# files listed in database/attendance/manifest.json, and reads only fetch the
+# months overlapping the requested dates.
+
+def attendance_key(date, employee_id):
+    """Key identifying one attendance record. IDs are always compared as strings."""
+    return (str(date), str(employee_id))
+
+def build_attendance_index(records_df):
+    """Map every (Date, EmployeeID) key of stored-format records to its row label for O(1) lookups."""
+    return dict(zip(zip(records_df["Date"].astype(str), records_df["EmployeeID"].astype(str)), records_df.index))
+
+def upsert_indexed_record(attendance_df, attendance_index, record):
+    """Apply a stored-format record change to a typed frame and its index.
+
+    The index is updated in place; the frame is returned, since adding a row
+    produces a new one.
+    """
+    key = attendance_key(record["Date"], record["EmployeeID"])
+    full_record = {column: None for column in ATTENDANCE_COLUMNS}
+    full_record.update(record)
+    full_record.update({"Date": key[0], "EmployeeID": key[1]})
+    typed_record = to_attendance_model(pd.DataFrame([full_record], columns=ATTENDANCE_COLUMNS))
+
+    if key[1] not in attendance_df["EmployeeID"].cat.categories:
+        attendance_df["EmployeeID"] = attendance_df["EmployeeID"].cat.add_categories([key[1]])
+
+    row = attendance_index.get(key)
+    if row is None:
+        row = attendance_df.index.max() + 1 if len(attendance_df) else 0
+        typed_record.index = [row]
+        typed_record["EmployeeID"] = pd.Categorical(
+            typed_record["EmployeeID"], categories=attendance_df["EmployeeID"].cat.categories
+        )
+        attendance_index[key] = row
+        return pd.concat([attendance_df, typed_record])
+
+    for column in record:
+        attendance_df.at[row, column] = typed_record.at[0, column]
+    return attendance_df
+
+def delete_indexed_record(attendance_df, attendance_index, date, employee_id):
+    """Remove a record from a typed frame and its index; returns the frame."""
+    row = attendance_index.pop(attendance_key(date, employee_id), None)
+    return attendance_df if row is None else attendance_df.drop(row)
+
+def load_attendance_file(filepath, fresh=False):
+    """Load an attendance file as (typed frame, index, sha).
+
+    The frame and its index are built once per sha and shared by every
+    session, so callers must copy them before editing.
+    """
+    data, content_sha = fetch_github_json(filepath, fresh=fresh)
+    cached = get_github_cache().get(filepath)
+    frames = cached["frames"] if cached and cached["sha"] == content_sha else {}
+
+    if "attendance" not in frames:
+        with perf_span("frame.build", path=filepath):
+            records_df = pd.DataFrame(data, columns=ATTENDANCE_COLUMNS)
+            frames["attendance"] = (to_attendance_model(records_df), build_attendance_index(records_df))
+    return (*frames["attendance"], content_sha)
+
+def fold_attendance_events(snapshot_df, events):
+    """Apply logged attendance events, oldest first, on top of a typed snapshot."""
+    if not events:
+        return snapshot_df
+
+    changes = {}
+    deleted = set()
+    for event in events:
+        key = attendance_key(event["Date"], event["EmployeeID"])
+        if event["Event"] == "delete":
+            changes[key] = None
+            deleted.add(key)
+        else:
+            record = changes.get(key) or {"Date": key[0], "EmployeeID": key[1]}
+            record.update({column: event[column] for column in ATTENDANCE_COLUMNS[2:] if column in event})
+            changes[key] = record
+
+    changed_df = pd.DataFrame(list(changes), columns=["Date", "EmployeeID"])
+    snapshot_keys = pd.MultiIndex.from_arrays([snapshot_df["Date"], snapshot_df["EmployeeID"].astype(str)])
+    touched = snapshot_keys.isin(pd.MultiIndex.from_arrays([
+        pd.to_datetime(changed_df["Date"], format="%d/%m/%Y"), changed_df["EmployeeID"]
+    ]))
+
+    # Events only carry the fields they change, so start from the snapshot row,
+    # unless the record was deleted since and re-created by later events
+    folded = []
+    base_records = {attendance_key(r["Date"], r["EmployeeID"]): r for r in attendance_records(snapshot_df[touched])}
+    for key, change in changes.items():
+        if change is None:
+            continue
+        record = {column: None for column in ATTENDANCE_COLUMNS}
+        if key not in deleted:
+            record.update(base_records.get(key, {}))
+        record.update(change)
+        folded.append(record)
+
+    folded_df = pd.concat(
+        [snapshot_df[~touched], to_attendance_model(pd.DataFrame(folded, columns=ATTENDANCE_COLUMNS))],
+        ignore_index=True
+    )
+    folded_df["EmployeeID"] = folded_df["EmployeeID"].astype(str).astype("category")
+    return folded_df
+
+def attendance_partition(date):
+    """Name of the month partition ("YYYY-MM") holding a DD/MM/YYYY date."""
+    day, month, year = str(date).split("/")
+    return f"{year}-{month}"
+
+def attendance_partition_path(partition):
+    """Repository path of a month partition file."""
+    return f"{FILE_PATHS['attendance_partitions']}/{partition}.json"
+
+def load_attendance_manifest(fresh=False):
+    """Load the list of month partitions and the manifest sha."""
+    manifest, manifest_sha = fetch_github_json(f"{FILE_PATHS['attendance_partitions']}/manifest.json", fresh=fresh)
+    return sorted((manifest or {}).get("partitions", [])), manifest_sha
+
+def update_attendance_manifest(partitions, manifest_sha):
+    """Write the list of month partitions."""
+    return update_github_json(
+        f"{FILE_PATHS['attendance_partitions']}/manifest.json",
+        {"partitions": sorted(partitions)},
+        manifest_sha
+    )
+
+def filter_attendance_period(attendance_df, start_date=None, end_date=None):
+    """Keep the records dated between start_date and end_date (inclusive, either may be None)."""
+    if start_date is None and end_date is None:
+        return attendance_df
+    mask = pd.Series(True, index=attendance_df.index)
+    if start_date is not None:
+        mask &= attendance_df["Date"] >= day_timestamp(start_date)
+    if end_date is not None:
+        mask &= attendance_df["Date"] <= day_timestamp(end_date)
+    return attendance_df[mask]
+
+def load_events_view(fresh=False):
+    """Current (frame, index) of the "events" layout: the snapshot with every log segment folded in.
+
+    The view is cached until the snapshot or a segment changes, and this
+    process's own appends are applied to it directly. Segments are listed
+    through the cached listing unless ``fresh`` is set, as writers do.
+    """
+    snapshot_df, _, snapshot_sha = load_attendance_file(FILE_PATHS["attendance"])
+    segments = list_github_directory(FILE_PATHS["attendance_events"], fresh=fresh)
+    view_key = {"snapshot": snapshot_sha, "segments": {segment["path"]: segment["sha"] for segment in segments}}
+    cached = get_github_cache().get("attendance_view")
+    if cached and cached["key"] == view_key:
+        return cached["frame"], cached["index"]
+
+    # A segment whose listed sha differs from the cached copy was appended to elsewhere
+    stale_paths = {
+        segment["path"] for segment in segments
+        if get_github_cache().get(segment["path"], {}).get("sha") != segment["sha"]
+    }
+    fetched = fetch_github_files([segment["path"] for segment in segments], stale_paths)
+    events = []
+    for segment in segments:
+        events.extend(fetched[segment["path"]][0])
+
+    with perf_span("frame.build", path=FILE_PATHS["attendance_events"]):
+        attendance_df = fold_attendance_events(snapshot_df, events)
+        attendance_index = build_attendance_index(format_attendance(attendance_df))
+    get_github_cache()["attendance_view"] = {"key": view_key, "frame": attendance_df, "index": attendance_index}
+    return attendance_df, attendance_index
+
+def load_github_attendance(start_date=None, end_date=None):
+    """Load the current attendance records dated between start_date and end_date.
+
+    Leaving both dates out loads the full history. In "monthly" mode only the
+    partitions overlapping the range are fetched.
+    """
+    if ATTENDANCE_STORAGE == "monthly":
+        partitions, _ = load_attendance_manifest()
+        first = start_date.strftime("%Y-%m") if start_date else ""
+        last = end_date.strftime("%Y-%m") if end_date else "9999-99"
+        partition_paths = [attendance_partition_path(partition) for partition in partitions if first <= partition <= last]
+        fetch_github_files(partition_paths)
+        frames = [load_attendance_file(partition_path)[0] for partition_path in partition_paths]
+        attendance_df = pd.concat(frames, ignore_index=True) if frames else empty_attendance()
+        attendance_df["EmployeeID"] = attendance_df["EmployeeID"].astype(str).astype("category")
+    elif ATTENDANCE_STORAGE == "events":
+        attendance_df, _ = load_events_view()
+    else:
+        attendance_df, _, _ = load_attendance_file(FILE_PATHS["attendance"])
+
+    return filter_attendance_period(attendance_df, start_date, end_date).copy()
+
+def find_github_attendance_record(date, employee_id):
+    """Look up one record through the (Date, EmployeeID) index; None when there is none."""
+    if ATTENDANCE_STORAGE == "events":
+        attendance_df, attendance_index = load_events_view()
+    else:
+        if ATTENDANCE_STORAGE == "monthly":
+            filepath = attendance_partition_path(attendance_partition(date))
+        else:
+            filepath = FILE_PATHS["attendance"]
+        attendance_df, attendance_index, _ = load_attendance_file(filepath)
+
+    row = attendance_index.get(attendance_key(date, employee_id))
+    return None if row is None else attendance_records(attendance_df.loc[[row]])[0]
+
+def attendance_change(mutation):
+    """The record fields carried by a mutation or logged event."""
+    return {column: mutation[column] for column in ATTENDANCE_COLUMNS if column in mutation}
+
+def mutation_allowed(mutation, present):
+    """Check a mutation's optional "Require" precondition against whether its record exists."""
+    required = mutation.get("Require")
+    return required is None or required == ("present" if present else "absent")
+
+def apply_attendance_mutations(attendance_df, attendance_index, mutations):
+    """Apply mutations in order to a typed frame and its index.
+
+    Returns the frame and one result per mutation: "saved", or "rejected"
+    when its precondition does not hold.
+    """
+    results = []
+    for mutation in mutations:
+        present = attendance_key(mutation["Date"], mutation["EmployeeID"]) in attendance_index
+        if not mutation_allowed(mutation, present):
+            results.append("rejected")
+        elif mutation["Event"] == "delete":
+            attendance_df = delete_indexed_record(attendance_df, attendance_index, mutation["Date"], mutation["EmployeeID"])
+            results.append("saved")
+        else:
+            attendance_df = upsert_indexed_record(attendance_df, attendance_index, attendance_change(mutation))
+            results.append("saved")
+    return attendance_df, results
+
+def append_attendance_events(events, view_df, view_index, extra_updates=()):
+    """Append events to the current log segment in one write; the write size is independent of history.
+
+    view_df and view_index are the events view with these events applied and
+    become the cached view once the write succeeds. extra_updates are other
+    files for write_github_files() to commit together with the segment.
+    """
+    segment_name = datetime.now(pytz.timezone(TIMEZONE)).strftime(EVENT_LOG_SEGMENT)
+    segment_path = f"{FILE_PATHS['attendance_events']}/{segment_name}.json"
+    segment_events, segment_sha = fetch_github_json(segment_path, fresh=True)
+
+    timestamp = datetime.now(pytz.timezone(TIMEZONE)).isoformat()
+    logged = [{"Event": event["Event"], "Timestamp": timestamp, **attendance_change(event)} for event in events]
+    if not write_github_files([(segment_path, segment_events + logged, segment_sha, "json"), *extra_updates]):
+        return False
+
+    # Keep the cached view current instead of folding every segment again
+    view = get_github_cache().get("attendance_view")
+    if view and view["key"]["segments"].get(segment_path) == segment_sha:
+        view.update(frame=view_df, index=view_index)
+        view["key"]["segments"][segment_path] = get_github_cache()[segment_path]["sha"]
+    return True
+
+def attendance_file_for(date):
+    """Path of the file holding a date's records."""
+    if ATTENDANCE_STORAGE != "monthly":
+        return FILE_PATHS["attendance"]
+    return attendance_partition_path(attendance_partition(date))
+
+def attendance_file_format(filepath):
+    """Format to rewrite an attendance file in: the one it is stored in, ATTENDANCE_FORMAT for new files.
+
+    Files only change format through Convert Attendance Files.
+    """
+    cached = get_github_cache().get(filepath)
+    return cached["format"] if cached and cached["sha"] is not None else ATTENDANCE_FORMAT
+
+def register_attendance_partitions(new_partitions):
+    """List month partitions in the manifest, retrying on sha conflicts. False when it kept failing."""
+    for _ in range(WRITE_RETRIES):
+        partitions, manifest_sha = load_attendance_manifest(fresh=True)
+        if set(new_partitions) <= set(partitions):
+            return True
+        if update_attendance_manifest(set(partitions) | set(new_partitions), manifest_sha):
+            return True
+    logging.getLogger("attendance.storage").warning("Month partitions %s are not in the manifest", sorted(new_partitions))
+    return False
+
+def commit_attendance_mutations(filepath, mutations):
+    """Apply mutations to one attendance file, or to the event log when filepath is None, in a single write.
+
+    A write refused because the sha went stale is retried on freshly fetched
+    data, so preconditions are checked again against whatever other writers
+    committed in between. Returns one result per mutation; "failed" when
+    every attempt was refused. The summary rows of the touched
+    employee-months are refreshed in the same commit.
+
+    Nothing is checked against a cached copy served while GitHub is
+    unavailable: the whole batch is "failed", so no punch is rejected on
+    old data.
+    """
+    for _ in range(WRITE_RETRIES):
+        failed_reads = failed_github_reads()
+        if filepath is None:
+            attendance_df, attendance_index = load_events_view(fresh=True)
+        else:
+            attendance_df, attendance_index, attendance_sha = load_attendance_file(filepath, fresh=True)
+        if failed_github_reads() != failed_reads:
+            return ["failed"] * len(mutations)
+        attendance_index = dict(attendance_index)
+        attendance_df, results = apply_attendance_mutations(attendance_df.copy(), attendance_index, mutations)
+
+        accepted = [mutation for mutation, result in zip(mutations, results) if result == "saved"]
+        if not accepted:
+            return results
+        summary_updates = github_summary_updates(summary_buckets(accepted), attendance_df, attendance_index)
+        if filepath is None:
+            written = append_attendance_events(accepted, attendance_df, attendance_index, summary_updates or [])
+        else:
+            written = write_github_files([(filepath, attendance_records(attendance_df), attendance_sha, attendance_file_format(filepath)), *(summary_updates or [])])
+            if written:
+                # The edited frame and index become the cached copy of the new version
+                get_github_cache()[filepath]["frames"]["attendance"] = (attendance_df, attendance_index)
+        if written:
+            if summary_updates is None and not rebuild_github_summary():
+                logging.getLogger("attendance.storage").warning("The attendance summary could not be built; use Rebuild Attendance Summary")
+            return results
+    return ["failed" if result == "saved" else result for result in results]
+
+def write_github_attendance_batch(mutations):
+    """Write a batch of mutations with one commit per touched file. Returns one result per mutation."""
+    if ATTENDANCE_STORAGE == "events":
+        return commit_attendance_mutations(None, mutations)
+
+    groups = {}
+    for position, mutation in enumerate(mutations):
+        partition = attendance_partition(mutation["Date"]) if ATTENDANCE_STORAGE == "monthly" else None
+        groups.setdefault(partition, []).append(position)
+
+    results = [None] * len(mutations)
+    for positions in groups.values():
+        filepath = attendance_file_for(mutations[positions[0]]["Date"])
+        group_results = commit_attendance_mutations(filepath, [mutations[position] for position in positions])
+        for position, result in zip(positions, group_results):
+            results[position] = result
+
+    # A month is listed in the manifest only once its file holds records, and
+    # every later write to it tries again if listing it failed
+    if ATTENDANCE_STORAGE == "monthly":
+        saved_partitions = {attendance_partition(mutation["Date"]) for mutation, result in zip(mutations, results) if result == "saved"}
+        if saved_partitions:
+            register_attendance_partitions(saved_partitions)
+    return results
+
+def migrate_attendance_to_partitions():
+    """Copy database/EmployeeAbsent.json into month partitions. Returns the partitions written.
+
+    Months that already have a file are live (written since the switch to
+    "monthly") and are left alone, so running it again is safe; they are
+    only listed in the manifest if they are missing from it.
+    """
+    attendance_df, _, _ = load_attendance_file(FILE_PATHS["attendance"], fresh=True)
+    partitions, _ = load_attendance_manifest(fresh=True)
+
+    written, existing = [], []
+    for partition, partition_df in attendance_df.groupby(attendance_df["Date"].dt.strftime("%Y-%m"), sort=True):
+        if partition in partitions:
+            continue
+        _, partition_sha = fetch_github_json(attendance_partition_path(partition), fresh=True)
+        if partition_sha is not None:
+            existing.append(partition)
+        elif update_github_json(attendance_partition_path(partition), attendance_records(partition_df), None, ATTENDANCE_FORMAT):
+            written.append(partition)
+
+    # The original file is left in place as a backup. The summary was built
+    # from the months listed before, so it is built again from all of them
+    if written or existing:
+        register_attendance_partitions(written + existing)
+        if not rebuild_github_summary():
+            logging.getLogger("attendance.storage").warning("The attendance summary could not be built; use Rebuild Attendance Summary")
+    return written
+
+def compact_attendance_events():
+    """Fold closed log segments into the snapshot and delete them. Returns the number folded.
+
+    Nothing is written unless every segment was read from GitHub at the
+    listed sha, and a segment is deleted by that sha, so only content that
+    went into the snapshot is removed.
+    """
+    failed_reads = failed_github_reads()
+    current_segment = datetime.now(pytz.timezone(TIMEZONE)).strftime(EVENT_LOG_SEGMENT) + ".json"
+    segments = [
+        segment for segment in list_github_directory(FILE_PATHS["attendance_events"], fresh=True)
+        if segment["name"] < current_segment
+    ]
+    if not segments:
+        return 0
+
+    snapshot_df, _, snapshot_sha = load_attendance_file(FILE_PATHS["attendance"], fresh=True)
+    events = []
+    for segment in segments:
+        segment_events, segment_sha = fetch_github_json(segment["path"], fresh=True)
+        if segment_sha != segment["sha"]:
+            distrust_github_file(segment["path"])
+            return 0
+        events.extend(segment_events)
+    if failed_github_reads() != failed_reads:
+        return 0
+
+    compacted_df = fold_attendance_events(snapshot_df, events)
+    if not update_github_json(FILE_PATHS["attendance"], attendance_records(compacted_df), snapshot_sha, attendance_file_format(FILE_PATHS["attendance"])):
+        return 0
+
+    # Replaying an already folded segment is harmless, so a failed delete is retried next time
+    return sum(delete_github_file(segment["path"], segment["sha"]) for segment in segments)
+
+def convert_attendance_files(file_format):
+    """Rewrite the attendance files of the current layout that are not yet in file_format.
+
+    Returns (converted, total) file counts.
+    """
+    if ATTENDANCE_STORAGE == "monthly":
+        partitions, _ = load_attendance_manifest(fresh=True)
+        filepaths = [attendance_partition_path(partition) for partition in partitions]
+    else:
+        filepaths = [FILE_PATHS["attendance"]]
+
+    converted = 0
+    for filepath, (data, content_sha) in fetch_github_files(filepaths, set(filepaths)).items():
+        cached = get_github_cache().get(filepath)
+        if content_sha is None or cached["format"] == file_format:
+            continue
+        converted += update_github_json(filepath, data, content_sha, file_format)
+    return converted, len(filepaths)
+
+# === Attendance Summary ===
+# database/attendance_summary/YYYY-MM.json (the attendance_summary table in
+# SQLite) holds one row per employee and month: days attended, days with a
+# daily log, first and last day seen, and hours worked. Every attendance write
+# recomputes only the employee-months it touched, from at most a month of
+# records, and commits only those months' files, so statistics are read in
+# O(employees) instead of scanning the whole history and a punch does not
+# rewrite the summary of every month.
+
+def summarize_attendance(attendance_df):
+    """Aggregate a typed attendance frame per employee and month."""
+    worked_seconds = (attendance_df["ClockOut"] - attendance_df["ClockIn"]).dt.total_seconds()
+    summary_df = attendance_df.assign(
+        EmployeeID=attendance_df["EmployeeID"].astype(str),
+        Month=attendance_df["Date"].dt.strftime("%Y-%m"),
+        Logged=attendance_df["DailyLog"].notna(),
+        Seconds=worked_seconds.where(worked_seconds > 0, 0.0)
+    ).groupby(["EmployeeID", "Month"]).agg(
+        DaysAttended=("Date", "size"),
+        DaysLogged=("Logged", "sum"),
+        FirstSeen=("Date", "min"),
+        LastSeen=("Date", "max"),
+        HoursWorked=("Seconds", "sum")
+    ).reset_index()
+    summary_df["HoursWorked"] = summary_df["HoursWorked"] / 3600
+    return summary_df[SUMMARY_COLUMNS]
+
+def to_summary_model(records_df):
+    """Convert summary rows in the stored string format into typed columns."""
+    return pd.DataFrame({
+        "EmployeeID": records_df["EmployeeID"].astype(str),
+        "Month": records_df["Month"].astype(str),
+        "DaysAttended": records_df["DaysAttended"].astype(int),
+        "DaysLogged": records_df["DaysLogged"].astype(int),
+        "FirstSeen": pd.to_datetime(records_df["FirstSeen"], format="%d/%m/%Y").astype("datetime64[s]"),
+        "LastSeen": pd.to_datetime(records_df["LastSeen"], format="%d/%m/%Y").astype("datetime64[s]"),
+        "HoursWorked": records_df["HoursWorked"].astype(float)
+    }, index=records_df.index)
+
+def summary_records(summary_df):
+    """Convert a typed summary frame back to stored records."""
+    formatted_df = summary_df[SUMMARY_COLUMNS].copy()
+    formatted_df["FirstSeen"] = summary_df["FirstSeen"].dt.strftime("%d/%m/%Y")
+    formatted_df["LastSeen"] = summary_df["LastSeen"].dt.strftime("%d/%m/%Y")
+    return dataframe_to_records(formatted_df)
+
+def summary_buckets(mutations):
+    """The (EmployeeID, "YYYY-MM") buckets touched by a batch of mutations."""
+    return {(str(mutation["EmployeeID"]), attendance_partition(mutation["Date"])) for mutation in mutations}
+
+def summarize_buckets(attendance_df, attendance_index, buckets):
+    """Summary rows of the given buckets, collecting each month's records through the index."""
+    rows = []
+    for employee_id, month in buckets:
+        first_day = pd.Timestamp(f"{month}-01")
+        for day in pd.date_range(first_day, periods=first_day.days_in_month):
+            row = attendance_index.get(attendance_key(day.strftime("%d/%m/%Y"), employee_id))
+            if row is not None:
+                rows.append(row)
+    return summarize_attendance(attendance_df.loc[rows])
+
+def summary_month_path(month):
+    """Repository path of a month's summary file."""
+    return f"{FILE_PATHS['attendance_summary']}/{month}.json"
+
+def rebuild_github_summary():
+    """Recompute every month's summary file from the attendance history, in one commit.
+
+    Months that no longer have records are emptied.
+    """
+    failed_reads = failed_github_reads()
+    summary_df = summarize_attendance(load_github_attendance())
+    listed = {item["path"]: item["sha"] for item in list_github_directory(FILE_PATHS["attendance_summary"], fresh=True)}
+    if failed_github_reads() != failed_reads:
+        return False
+
+    updates = [
+        (summary_month_path(month), summary_records(month_df), listed.pop(summary_month_path(month), None), "json")
+        for month, month_df in summary_df.groupby("Month", sort=True)
+    ]
+    updates += [(filepath, [], content_sha, "json") for filepath, content_sha in listed.items()]
+    return write_github_files(updates) if updates else True
+
+def github_summary_updates(buckets, attendance_df, attendance_index):
+    """The summary files of the touched months with the given buckets recomputed from the attendance being
+    written, as updates for write_github_files(). None when there is no summary yet to patch; the caller
+    builds one then.
+    """
+    if not list_github_directory(FILE_PATHS["attendance_summary"]):
+        return None
+
+    filepaths = {month: summary_month_path(month) for month in sorted({month for _, month in buckets})}
+    fetch_github_files(list(filepaths.values()), set(filepaths.values()))
+    updates = []
+    for month, filepath in filepaths.items():
+        summary_df, summary_sha = load_github_dataframe(filepath, columns=SUMMARY_COLUMNS)
+        month_buckets = {bucket for bucket in buckets if bucket[1] == month}
+        kept = [bucket not in month_buckets for bucket in zip(summary_df["EmployeeID"].astype(str), summary_df["Month"])]
+        records = dataframe_to_records(summary_df[kept]) + summary_records(summarize_buckets(attendance_df, attendance_index, month_buckets))
+        records.sort(key=lambda record: record["EmployeeID"])
+        updates.append((filepath, records, summary_sha, "json"))
+    return updates
+
+def load_github_summary():
+    """Load the summary of every month, building it first when there is none yet."""
+    filepaths = [item["path"] for item in list_github_directory(FILE_PATHS["attendance_summary"])]
+    if not filepaths and rebuild_github_summary():
+        filepaths = [item["path"] for item in list_github_directory(FILE_PATHS["attendance_summary"])]
+    fetch_github_files(filepaths)
+    frames = [load_github_dataframe(filepath, columns=SUMMARY_COLUMNS)[0] for filepath in filepaths]
+    summary_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SUMMARY_COLUMNS)
+    return to_summary_model(summary_df)
+
+# === Signatures ===
+# Supervisor signatures are kept per employee as signed date ranges in
+# database/Signatures.json (the signatures table in SQLite), which never
+# overlap or touch. Signing or unsigning a period cuts it out of the
+# overlapping ranges and, when signing, merges it back in as one range, all
+# column-wise; a record is signed when its Date lies in one of its
+# employee's ranges.
+
+def to_signature_model(records_df):
+    """Convert signature ranges in the stored string format into typed columns."""
+    return pd.DataFrame({
+        "EmployeeID": records_df["EmployeeID"].astype(str),
+        "Start": pd.to_datetime(records_df["Start"], format="%d/%m/%Y").astype("datetime64[s]"),
+        "End": pd.to_datetime(records_df["End"], format="%d/%m/%Y").astype("datetime64[s]")
+    }, index=records_df.index)
+
+def signature_records(signatures_df):
+    """Convert typed signature ranges back to stored records."""
+    return dataframe_to_records(signatures_df.assign(
+        Start=signatures_df["Start"].dt.strftime("%d/%m/%Y"),
+        End=signatures_df["End"].dt.strftime("%d/%m/%Y")
+    )[SIGNATURE_COLUMNS])
+
+def merge_signature_ranges(signatures_df):
+    """Merge each employee's overlapping or adjacent ranges; expects rows sorted by EmployeeID and Start."""
+    if signatures_df.empty:
+        return signatures_df
+    reach = signatures_df.groupby("EmployeeID")["End"].cummax()
+    previous_reach = reach.groupby(signatures_df["EmployeeID"]).shift()
+    starts_range = previous_reach.isna() | (signatures_df["Start"] > previous_reach + pd.Timedelta(days=1))
+    return signatures_df.groupby(starts_range.cumsum()).agg(
+        EmployeeID=("EmployeeID", "first"),
+        Start=("Start", "min"),
+        End=("End", "max")
+    ).reset_index(drop=True)
+
+def update_signature_ranges(signatures_df, employee_ids, start_date, end_date, signed=True):
+    """Sign (or unsign) start_date to end_date, inclusive, for the given employees. Returns the new ranges.
+
+    signed is one flag for all employees or one per employee, so a mix of
+    signing and unsigning is a single update.
+    """
+    start, end = day_timestamp(start_date), day_timestamp(end_date)
+    changes = pd.DataFrame({"EmployeeID": pd.Series(employee_ids, dtype=str).to_numpy(), "Signed": signed})\
+        .drop_duplicates("EmployeeID", keep="last")
+    employee_ids = changes["EmployeeID"]
+    overlapping = (
+        signatures_df["EmployeeID"].isin(employee_ids)
+        & (signatures_df["Start"] <= end)
+        & (signatures_df["End"] >= start)
+    )
+    # Cut the period out of the ranges overlapping it, keeping their parts on either side
+    cut = signatures_df[overlapping]
+    pieces = [
+        signatures_df[~overlapping],
+        cut[cut["Start"] < start].assign(End=start - pd.Timedelta(days=1)),
+        cut[cut["End"] > end].assign(Start=end + pd.Timedelta(days=1))
+    ]
+    pieces.append(pd.DataFrame({"EmployeeID": employee_ids[changes["Signed"].astype(bool)], "Start": start, "End": end}))
+    ranges = pd.concat(pieces, ignore_index=True).astype({"Start": "datetime64[s]", "End": "datetime64[s]"})
+    return merge_signature_ranges(ranges.sort_values(["EmployeeID", "Start"], ignore_index=True))
+
+def signature_mask(records_df, signatures_df):
+    """Whether each record's Date lies in a signed range of its employee, via an as-of join on range starts."""
+    if records_df.empty or signatures_df.empty:
+        return pd.Series(False, index=records_df.index)
+    records = pd.DataFrame({
+        "EmployeeID": records_df["EmployeeID"].astype(str).to_numpy(),
+        "Date": records_df["Date"].astype("datetime64[s]").to_numpy(),
+        "Row": range(len(records_df))
+    }).sort_values("Date")
+    # Ranges never overlap, so the last one starting on or before a date is the only one that can hold it
+    matched = pd.merge_asof(
+        records, signatures_df.sort_values("Start"), left_on="Date", right_on="Start", by="EmployeeID"
+    )
+    signed = pd.Series((matched["End"] >= matched["Date"]).to_numpy(), index=matched["Row"]).sort_index()
+    return pd.Series(signed.to_numpy(), index=records_df.index)
+
+def load_github_signatures():
+    signatures_df, _ = load_github_dataframe(FILE_PATHS["signatures"], columns=SIGNATURE_COLUMNS)
+    return to_signature_model(signatures_df)
+
+def write_github_signatures(employee_ids, start_date, end_date, signed):
+    """Sign or unsign a period in the signatures file in one commit, retrying on sha conflicts."""
+    for _ in range(WRITE_RETRIES):
+        signatures_df, signatures_sha = load_github_dataframe(FILE_PATHS["signatures"], columns=SIGNATURE_COLUMNS, fresh=True)
+        updated_df = update_signature_ranges(to_signature_model(signatures_df), employee_ids, start_date, end_date, signed)
+        if update_github_json(FILE_PATHS["signatures"], signature_records(updated_df), signatures_sha):
+            return True
+    return False
+
+# === Storage Backends ===
+# Both backends offer the same methods, and the pages only talk to the one
+# returned by get_storage().
+
+class GitHubStore:
+    """Attendance and employees kept as JSON files in REPOSITORY, laid out per ATTENDANCE_STORAGE."""
+
+    def preload(self, attendance=False, summary=False):
+        """Fetch the employee file, plus the attendance entry file and the summary when asked, at the same time."""
+        filepaths = [FILE_PATHS["employee"]]
+        if attendance and ATTENDANCE_STORAGE == "monthly":
+            filepaths.append(f"{FILE_PATHS['attendance_partitions']}/manifest.json")
+        elif attendance:
+            filepaths.append(FILE_PATHS["attendance"])
+        if summary:
+            filepaths += [item["path"] for item in list_github_directory(FILE_PATHS["attendance_summary"])]
+        fetch_github_files(filepaths)
+
+    def load_attendance(self, start_date=None, end_date=None):
+        return load_github_attendance(start_date, end_date)
+
+    def find_attendance_record(self, date, employee_id):
+        return find_github_attendance_record(date, employee_id)
+
+    def apply_attendance_batch(self, mutations):
+        return write_github_attendance_batch(mutations)
+
+    def load_attendance_summary(self):
+        return load_github_summary()
+
+    def rebuild_attendance_summary(self):
+        return rebuild_github_summary()
+
+    def load_signatures(self):
+        return load_github_signatures()
+
+    def sign_attendance(self, employee_ids, start_date, end_date, signed=True):
+        return write_github_signatures(employee_ids, start_date, end_date, signed)
+
+    def load_employees(self):
+        employee_df, _ = load_github_dataframe(FILE_PATHS["employee"], columns=EMPLOYEE_COLUMNS)
+        return to_employee_model(employee_df)
+
+    def load_employee_index(self):
+        _, employee_sha = fetch_github_json(FILE_PATHS["employee"])
+        return get_employee_index(employee_sha, self.load_employees)
+
+    def update_employees(self, change):
+        """Write change(employee frame) to the employee file, retrying on sha conflicts."""
+        for _ in range(WRITE_RETRIES):
+            employee_df, employee_sha = load_github_dataframe(FILE_PATHS["employee"], columns=EMPLOYEE_COLUMNS, fresh=True)
+            if update_github_json(FILE_PATHS["employee"], dataframe_to_records(change(employee_df)), employee_sha):
+                return True
+        return False
+
+    def save_employee(self, employee):
+        return self.update_employees(lambda employee_df: pd.concat([employee_df, pd.DataFrame([employee])], ignore_index=True))
+
+    def import_employees(self, employees):
+        """Add or update employees by EmployeeID in one commit, keeping the existing order."""
+        imported_df = pd.DataFrame(employees, columns=EMPLOYEE_COLUMNS).set_index("EmployeeID")
 
-employee_data, employee_sha = fetch_github_json(FILE_PATHS["employee"])
-employee_df = pd.DataFrame(employee_data)
-employee_df["DisplayName"] = employee_df["EmployeeID"].astype(str) + " - " + employee_df["Name"]
+        def merge(employee_df):
+            current_df = employee_df.assign(EmployeeID=employee_df["EmployeeID"].astype(str)).set_index("EmployeeID")
+            current_df.update(imported_df)
+            return pd.concat([current_df, imported_df[~imported_df.index.isin(current_df.index)]]).reset_index()
+        return self.update_employees(merge)
+
+    def delete_employee(self, employee_id):
+        return self.update_employees(lambda employee_df: employee_df[employee_df["EmployeeID"].astype(str) != str(employee_id)])
+
+class SQLiteStore:
+    """Attendance and employees kept in a local SQLite database.
+
+    Records are keyed by (Date, EmployeeID) with a second index on
+    EmployeeID, so clock-ins and edits are single-row upserts and deletes.
+    Dates are stored as YYYY-MM-DD so range reads use the index; the
+    DD/MM/YYYY format is restored on the way out.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS attendance (
+            Date TEXT NOT NULL,
+            EmployeeID TEXT NOT NULL,
+            ClockIn TEXT,
+            ClockOut TEXT,
+            DailyLog TEXT,
+            PRIMARY KEY (Date, EmployeeID)
+        );
+        CREATE INDEX IF NOT EXISTS attendance_employee ON attendance (EmployeeID);
+        CREATE TABLE IF NOT EXISTS employees (
+            EmployeeID TEXT PRIMARY KEY,
+            Name TEXT NOT NULL,
+            Department TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS attendance_summary (
+            EmployeeID TEXT NOT NULL,
+            Month TEXT NOT NULL,
+            DaysAttended INTEGER NOT NULL,
+            DaysLogged INTEGER NOT NULL,
+            FirstSeen TEXT NOT NULL,
+            LastSeen TEXT NOT NULL,
+            HoursWorked REAL NOT NULL,
+            PRIMARY KEY (EmployeeID, Month)
+        );
+        CREATE TABLE IF NOT EXISTS signatures (
+            EmployeeID TEXT NOT NULL,
+            Start TEXT NOT NULL,
+            End TEXT NOT NULL,
+            PRIMARY KEY (EmployeeID, Start)
+        );
+    """
+    SUMMARY_SELECT = """
+        SELECT EmployeeID, substr(Date, 1, 7), COUNT(*), COUNT(DailyLog), MIN(Date), MAX(Date),
+               SUM(CASE WHEN ClockOut > ClockIn
+                        THEN strftime('%s', ClockOut) - strftime('%s', ClockIn)
+                        ELSE 0 END) / 3600.0
+        FROM attendance
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(self.SCHEMA)
+            if connection.execute("SELECT 1 FROM attendance_summary LIMIT 1").fetchone() is None:
+                self.rebuild_summary(connection)
+
+    def preload(self, attendance=False, summary=False):
+        """Nothing to fetch ahead; every read is a local query."""
+
+    @contextmanager
+    def connect(self):
+        """Open a connection that commits on success and is always closed."""
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def to_iso_date(date):
+        """Convert a DD/MM/YYYY string or a date object to YYYY-MM-DD."""
+        if isinstance(date, str):
+            day, month, year = date.split("/")
+            return f"{year}-{month}-{day}"
+        return date.strftime("%Y-%m-%d")
+
+    def load_attendance(self, start_date=None, end_date=None):
+        query = """
+            SELECT substr(Date, 9, 2) || '/' || substr(Date, 6, 2) || '/' || substr(Date, 1, 4) AS Date,
+                   EmployeeID, ClockIn, ClockOut, DailyLog
+            FROM attendance
+            WHERE Date BETWEEN ? AND ?
+            ORDER BY rowid
+        """
+        first = self.to_iso_date(start_date) if start_date else "0000-00-00"
+        last = self.to_iso_date(end_date) if end_date else "9999-99-99"
+        with self.connect() as connection:
+            return to_attendance_model(pd.read_sql_query(query, connection, params=(first, last)))
+
+    def find_attendance_record(self, date, employee_id):
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT ClockIn, ClockOut, DailyLog FROM attendance WHERE Date = ? AND EmployeeID = ?",
+                (self.to_iso_date(date), str(employee_id))
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(ATTENDANCE_COLUMNS, (date, str(employee_id), *row)))
+
+    @staticmethod
+    def upsert_statement(record):
+        """INSERT ... ON CONFLICT statement and parameters writing only the fields present in record."""
+        columns = [column for column in ATTENDANCE_COLUMNS[2:] if column in record]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+        query = f"""
+            INSERT INTO attendance (Date, EmployeeID{"".join(", " + column for column in columns)})
+            VALUES ({", ".join("?" * (len(columns) + 2))})
+            ON CONFLICT (Date, EmployeeID) DO {f"UPDATE SET {updates}" if columns else "NOTHING"}
+        """
+        params = [SQLiteStore.to_iso_date(record["Date"]), str(record["EmployeeID"])] + [record[column] for column in columns]
+        return query, params
+
+    def apply_attendance_batch(self, mutations):
+        """Apply mutations in order inside one transaction; all of them fail together."""
+        results = []
+        try:
+            with self.connect() as connection:
+                for mutation in mutations:
+                    key = (self.to_iso_date(mutation["Date"]), str(mutation["EmployeeID"]))
+                    present = connection.execute(
+                        "SELECT 1 FROM attendance WHERE Date = ? AND EmployeeID = ?", key
+                    ).fetchone() is not None
+                    if not mutation_allowed(mutation, present):
+                        results.append("rejected")
+                        continue
+                    if mutation["Event"] == "delete":
+                        connection.execute("DELETE FROM attendance WHERE Date = ? AND EmployeeID = ?", key)
+                    else:
+                        connection.execute(*self.upsert_statement(attendance_change(mutation)))
+                    results.append("saved")
+
+                for employee_id, month in summary_buckets(
+                    [mutation for mutation, result in zip(mutations, results) if result == "saved"]
+                ):
+                    self.refresh_summary(connection, employee_id, month)
+            return results
+        except sqlite3.Error:
+            return ["failed"] * len(mutations)
+
+    def rebuild_summary(self, connection):
+        """Recompute the whole attendance_summary table inside the caller's transaction."""
+        connection.execute("DELETE FROM attendance_summary")
+        connection.execute(f"INSERT INTO attendance_summary {self.SUMMARY_SELECT} GROUP BY EmployeeID, substr(Date, 1, 7)")
+
+    def refresh_summary(self, connection, employee_id, month):
+        """Recompute one employee-month of attendance_summary inside the caller's transaction."""
+        connection.execute("DELETE FROM attendance_summary WHERE EmployeeID = ? AND Month = ?", (employee_id, month))
+        connection.execute(
+            f"INSERT INTO attendance_summary {self.SUMMARY_SELECT} WHERE EmployeeID = ? AND Date BETWEEN ? AND ? GROUP BY EmployeeID",
+            (employee_id, f"{month}-01", f"{month}-31")
+        )
+
+    def load_attendance_summary(self):
+        query = """
+            SELECT EmployeeID, Month, DaysAttended, DaysLogged,
+                substr(FirstSeen, 9, 2) || '/' || substr(FirstSeen, 6, 2) || '/' || substr(FirstSeen, 1, 4) AS FirstSeen,
+                substr(LastSeen, 9, 2) || '/' || substr(LastSeen, 6, 2) || '/' || substr(LastSeen, 1, 4) AS LastSeen,
+                HoursWorked
+            FROM attendance_summary
+        """
+        with self.connect() as connection:
+            return to_summary_model(pd.read_sql_query(query, connection))
+
+    def rebuild_attendance_summary(self):
+        try:
+            with self.connect() as connection:
+                self.rebuild_summary(connection)
+            return True
+        except sqlite3.Error:
+            return False
+
+    def select_signatures(self, connection, employee_ids=None):
+        """Signature ranges, only of employee_ids when given, inside the caller's transaction."""
+        query = """
+            SELECT EmployeeID,
+                substr(Start, 9, 2) || '/' || substr(Start, 6, 2) || '/' || substr(Start, 1, 4) AS Start,
+                substr(End, 9, 2) || '/' || substr(End, 6, 2) || '/' || substr(End, 1, 4) AS End
+            FROM signatures
+        """
+        params = []
+        if employee_ids is not None:
+            query += f" WHERE EmployeeID IN ({', '.join('?' * len(employee_ids))})"
+            params = list(employee_ids)
+        return to_signature_model(pd.read_sql_query(query, connection, params=params))
+
+    def load_signatures(self):
+        with self.connect() as connection:
+            return self.select_signatures(connection)
+
+    def sign_attendance(self, employee_ids, start_date, end_date, signed=True):
+        """Rewrite the ranges of the given employees in one transaction."""
+        unique_ids = [str(employee_id) for employee_id in pd.unique(pd.Series(employee_ids, dtype=str))]
+        try:
+            with self.connect() as connection:
+                signatures_df = self.select_signatures(connection, unique_ids)
+                updated_df = update_signature_ranges(signatures_df, employee_ids, start_date, end_date, signed)
+                connection.execute(f"DELETE FROM signatures WHERE EmployeeID IN ({', '.join('?' * len(unique_ids))})", unique_ids)
+                connection.executemany(
+                    "INSERT INTO signatures VALUES (?, ?, ?)",
+                    zip(updated_df["EmployeeID"], updated_df["Start"].dt.strftime("%Y-%m-%d"), updated_df["End"].dt.strftime("%Y-%m-%d"))
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def load_employees(self):
+        with self.connect() as connection:
+            return to_employee_model(
+                pd.read_sql_query("SELECT EmployeeID, Name, Department FROM employees ORDER BY rowid", connection)
+            )
+
+    def load_employee_index(self):
+        """The index is keyed by a hash of the rows, which stands in for the file sha of the GitHub store."""
+        employee_df = self.load_employees()
+        employee_hash = hashlib.sha1(pd.util.hash_pandas_object(employee_df, index=False).to_numpy().tobytes()).hexdigest()
+        return get_employee_index(employee_hash, lambda: employee_df)
+
+    def save_employee(self, employee):
+        try:
+            with self.connect() as connection:
+                connection.execute(
+                    "INSERT INTO employees (EmployeeID, Name, Department) VALUES (?, ?, ?)",
+                    (str(employee["EmployeeID"]), employee["Name"], employee["Department"])
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def import_employees(self, employees):
+        """Add or update employees by EmployeeID in one transaction."""
+        try:
+            with self.connect() as connection:
+                connection.executemany(
+                    """
+                    INSERT INTO employees (EmployeeID, Name, Department) VALUES (?, ?, ?)
+                    ON CONFLICT (EmployeeID) DO UPDATE SET Name = excluded.Name, Department = excluded.Department
+                    """,
+                    [(str(employee["EmployeeID"]), employee["Name"], employee["Department"]) for employee in employees]
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def delete_employee(self, employee_id):
+        try:
+            with self.connect() as connection:
+                connection.execute("DELETE FROM employees WHERE EmployeeID = ?", (str(employee_id),))
+            return True
+        except sqlite3.Error:
+            return False
+
+    def import_from(self, source):
+        """Replace this database's contents with everything held by another store."""
+        employee_df = source.load_employees()[EMPLOYEE_COLUMNS]
+        attendance_df = pd.DataFrame(attendance_records(source.load_attendance()), columns=ATTENDANCE_COLUMNS)
+        attendance_df["Date"] = attendance_df["Date"].map(self.to_iso_date)
+        signatures_df = source.load_signatures()
+
+        with self.connect() as connection:
+            connection.execute("DELETE FROM employees")
+            connection.execute("DELETE FROM attendance")
+            connection.execute("DELETE FROM signatures")
+            connection.executemany(
+                "INSERT OR REPLACE INTO employees VALUES (?, ?, ?)",
+                [(str(employee_id), name, department) for employee_id, name, department in employee_df.itertuples(index=False)]
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO attendance VALUES (?, ?, ?, ?, ?)",
+                [(date, str(employee_id), *values) for date, employee_id, *values in attendance_df.itertuples(index=False)]
+            )
+            connection.executemany(
+                "INSERT INTO signatures VALUES (?, ?, ?)",
+                zip(signatures_df["EmployeeID"], signatures_df["Start"].dt.strftime("%Y-%m-%d"), signatures_df["End"].dt.strftime("%Y-%m-%d"))
+            )
+            self.rebuild_summary(connection)
+        return len(employee_df), len(attendance_df)
+
+@st.cache_resource
+def get_storage():
+    """The storage backend selected by STORAGE_BACKEND, shared by every session."""
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteStore(SQLITE_PATH)
+    return GitHubStore()
+
+class AttendanceWriteQueue:
+    """Group commit for attendance writes arriving from many sessions at once.
+
+    A mutation uses the event format ({"Event": "upsert" | "delete", "Date",
+    "EmployeeID", fields...}) plus an optional "Require": "absent" | "present"
+    precondition. The first writer to arrive waits WRITE_COALESCE_WINDOW,
+    then applies everything queued meanwhile as one batch while later writers
+    wait for their own result, so a burst costs one commit per window rather
+    than one per employee.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.lock = threading.Lock()
+        self.commit_lock = threading.Lock()
+        self.pending = []
+
+    def submit(self, mutation):
+        """Queue a mutation and block until its batch is written. Returns "saved", "rejected" or "failed"."""
+        with perf_span("attendance.write") as span:
+            span["result"] = self.write([mutation])[0]
+        return span["result"]
+
+    def submit_batch(self, mutations):
+        """Queue several mutations, in order, and block until they are written. Returns one result per mutation."""
+        with perf_span("attendance.write", mutations=len(mutations)) as span:
+            results = self.write(mutations)
+            span["saved"] = results.count("saved")
+        return results
+
+    def write(self, mutations):
+        futures = [Future() for _ in mutations]
+        with self.lock:
+            leader = not self.pending
+            self.pending.extend(zip(mutations, futures))
+
+        if leader:
+            time.sleep(WRITE_COALESCE_WINDOW)
+            with self.commit_lock:
+                with self.lock:
+                    batch, self.pending = self.pending, []
+                results = ["failed"] * len(batch)
+                try:
+                    results = self.storage.apply_attendance_batch([queued for queued, _ in batch])
+                finally:
+                    for (_, queued_future), result in zip(batch, results):
+                        queued_future.set_result(result)
+        return [future.result() for future in futures]
+
+@st.cache_resource
+def get_write_queue():
+    """The attendance write queue in front of get_storage(), shared by every session."""
+    return AttendanceWriteQueue(get_storage())
+
+# === Kiosk Queue ===
+# In KIOSK_MODE a punch is acknowledged as soon as it is on local disk, so a
+# clock-in tablet on flaky Wi-Fi never makes anyone wait for (or retry) a
+# GitHub commit. A background thread pushes the queue through the write
+# queue; the punches keep the date and times taken when they were made.
+
+class KioskQueue:
+    """Durable write-ahead queue of attendance mutations in a JSON-lines file.
+
+    append() returns once the line is fsync'd. The flusher thread sends
+    everything queued as one batch whenever something is appended, and every
+    KIOSK_FLUSH_INTERVAL while punches keep failing. Saved and rejected
+    punches (e.g. a second clock-in made offline) leave the queue; failed
+    ones stay for the next attempt.
+    """
+
+    def __init__(self, path, write_queue):
+        self.path = path
+        self.write_queue = write_queue
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.logger = logging.getLogger("attendance.kiosk")
+        self.entries = self.read()
+        # Drop a torn last line from the file too, so the next append does not run on from it
+        if os.path.exists(self.path):
+            self.rewrite(self.entries)
+        # Punches left over from before a restart are sent right away
+        self.wake.set()
+        threading.Thread(target=self.run, name="kiosk-flusher", daemon=True).start()
+
+    def read(self):
+        """Queued mutations on disk. A line cut off by a crash mid-append was never acknowledged and is skipped."""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    self.logger.warning("Skipping torn kiosk queue line: %r", line)
+        return entries
+
+    def append(self, mutation):
+        """Make a mutation durable and queue it for the flusher."""
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as file:
+                file.write(json.dumps(mutation) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self.entries.append(mutation)
+        self.wake.set()
+
+    def rewrite(self, entries):
+        """Replace the file with entries; the rename keeps a crash from leaving a half-written queue."""
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as file:
+            file.writelines(json.dumps(entry) + "\n" for entry in entries)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.entries)
+
+    def pending_changes(self, date, employee_id):
+        """Queued mutations of an employee's record for a day, oldest first."""
+        key = attendance_key(date, employee_id)
+        with self.lock:
+            return [entry for entry in self.entries if attendance_key(entry["Date"], entry["EmployeeID"]) == key]
+
+    def flush(self):
+        """Send the queued punches as one batch and drop the ones that were settled. Returns how many were."""
+        with self.lock:
+            batch = list(self.entries)
+        if not batch:
+            return 0
+
+        results = self.write_queue.submit_batch(batch)
+        for mutation, result in zip(batch, results):
+            if result == "rejected":
+                self.logger.warning("Dropping kiosk punch the store rejected: %s", json.dumps(mutation))
+
+        with self.lock:
+            # Punches appended while the batch was written follow the unsettled ones
+            remaining = [mutation for mutation, result in zip(batch, results) if result == "failed"]
+            remaining += self.entries[len(batch):]
+            self.rewrite(remaining)
+            self.entries = remaining
+        return len(batch) - results.count("failed")
+
+    def run(self):
+        while True:
+            self.wake.wait(KIOSK_FLUSH_INTERVAL)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Whatever went wrong, the punches are still on disk for the next attempt
+                self.logger.exception("Kiosk queue flush failed")
+
+@st.cache_resource
+def get_kiosk_queue():
+    """The process-wide kiosk queue in front of get_write_queue(); starts its flusher."""
+    return KioskQueue(KIOSK_QUEUE_PATH, get_write_queue())
+
+def record_punch(mutation):
+    """Write a clock-in or clock-out. In KIOSK_MODE it is only queued locally and "queued" is returned."""
+    if KIOSK_MODE:
+        get_kiosk_queue().append(mutation)
+        return "queued"
+    return get_write_queue().submit(mutation)
+
+def find_punch_record(date, employee_id):
+    """An employee's record for a day, including punches still waiting in the kiosk queue."""
+    if not KIOSK_MODE:
+        return get_storage().find_attendance_record(date, employee_id)
+
+    pending = get_kiosk_queue().pending_changes(date, employee_id)
+    # A queued clock-in carries the whole record, so the store is only asked when it may hold the rest
+    complete = pending and (pending[0]["Event"] == "delete" or set(ATTENDANCE_COLUMNS) <= pending[0].keys())
+    record = None if complete else get_storage().find_attendance_record(date, employee_id)
+    for change in pending:
+        if not mutation_allowed(change, record is not None):
+            continue
+        if change["Event"] == "delete":
+            record = None
+        else:
+            record = {**(record or dict.fromkeys(ATTENDANCE_COLUMNS)), **attendance_change(change)}
+    return record
+
+# === Timesheets ===
+# Worked time, lateness, early leave and overtime are computed column-wise on
+# the typed attendance frame against the SHIFT_START-SHIFT_END schedule, then
+# summed per employee and week or month.
+
+def compute_timesheet(attendance_df, shift_start, shift_end, rounding):
+    """Per-record worked time (rounded to ``rounding``), late arrival, early leave and overtime."""
+    scheduled = shift_end - shift_start
+    worked = (attendance_df["ClockOut"] - attendance_df["ClockIn"]).clip(lower=pd.Timedelta(0)).dt.round(rounding)
+    return pd.DataFrame({
+        "Date": attendance_df["Date"],
+        "EmployeeID": attendance_df["EmployeeID"].astype(str),
+        "Worked": worked,
+        "Late": (attendance_df["ClockIn"] - shift_start).clip(lower=pd.Timedelta(0)),
+        "EarlyLeave": (shift_end - attendance_df["ClockOut"]).clip(lower=pd.Timedelta(0)),
+        "Overtime": (worked - scheduled).clip(lower=pd.Timedelta(0)),
+        "MissingClockIn": attendance_df["ClockIn"].isna()
+    }, index=attendance_df.index)
+
+def summarize_timesheet(timesheet_df, period):
+    """Sum a per-record timesheet per employee and period ("W" for weeks, "M" for months)."""
+    return timesheet_df.assign(
+        Period=timesheet_df["Date"].dt.to_period(period).dt.start_time.astype("datetime64[s]"),
+        LateDays=timesheet_df["Late"] > pd.Timedelta(0),
+        EarlyLeaveDays=timesheet_df["EarlyLeave"] > pd.Timedelta(0)
+    ).groupby(["Period", "EmployeeID"]).agg(
+        Days=("Date", "size"),
+        Worked=("Worked", "sum"),
+        Overtime=("Overtime", "sum"),
+        Late=("Late", "sum"),
+        LateDays=("LateDays", "sum"),
+        EarlyLeave=("EarlyLeave", "sum"),
+        EarlyLeaveDays=("EarlyLeaveDays", "sum"),
+        MissingClockIn=("MissingClockIn", "sum")
+    ).reset_index()
+
+def format_durations(durations):
+    """Format a timedelta column as H:MM strings that may exceed 24 hours."""
+    minutes = durations.dt.total_seconds() // 60
+    return (minutes // 60).astype("Int64").astype(str) + ":" + (minutes % 60).astype("Int64").astype(str).str.zfill(2)
+
+# === Excel Reports ===
+# Workbooks are built only when the download button is pressed, streamed with
+# xlsxwriter's constant_memory mode (each row is flushed to disk as soon as it
+# is written) and cached by a digest of the exact data they contain.
+
+def frame_digest(frame):
+    """Stable digest of a DataFrame's columns and values."""
+    digest = hashlib.sha1("|".join(map(str, frame.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def excel_cell_values(frame):
+    """Convert a frame to plain cell values: date serials, day fractions for times and None for blanks."""
+    cells = {}
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = (values - pd.Timestamp("1899-12-30")) / pd.Timedelta(days=1)
+        elif pd.api.types.is_timedelta64_dtype(values):
+            values = values / pd.Timedelta(days=1)
+        cells[column] = values.astype(object)
+    cells_df = pd.DataFrame(cells)
+    return cells_df.where(cells_df.notna(), None)
+
+def write_excel_sheet(workbook, sheet_name, frame):
+    """Stream a frame into a new worksheet row by row, with typed date and time columns."""
+    worksheet = workbook.add_worksheet(sheet_name)
+    date_format = workbook.add_format({"num_format": "dd/mm/yyyy"})
+    time_format = workbook.add_format({"num_format": "[hh]:mm:ss"})
+
+    for position, column in enumerate(frame.columns):
+        column_format = None
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            column_format = date_format
+        elif pd.api.types.is_timedelta64_dtype(frame[column]):
+            column_format = time_format
+        worksheet.set_column(position, position, EXCEL_COLUMN_WIDTHS.get(column, 14), column_format)
+
+    worksheet.write_row(0, 0, list(frame.columns), workbook.add_format({"bold": True}))
+    worksheet.freeze_panes(1, 0)
+    for start in range(0, len(frame), EXCEL_CHUNK_ROWS):
+        chunk = excel_cell_values(frame.iloc[start:start + EXCEL_CHUNK_ROWS])
+        for offset, values in enumerate(chunk.itertuples(index=False, name=None)):
+            worksheet.write_row(start + offset + 1, 0, values)
+    worksheet.autofilter(0, 0, len(frame), len(frame.columns) - 1)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_excel_report(report_key, _report_sheets):
+    """Build the .xlsx bytes for {sheet name: frame}; report_key must identify the frames' contents."""
+    with perf_span("excel.build", rows=sum(len(frame) for frame in _report_sheets.values())) as span:
+        excel_buffer = BytesIO()
+        workbook = xlsxwriter.Workbook(excel_buffer, {"constant_memory": True})
+        for sheet_name, frame in _report_sheets.items():
+            write_excel_sheet(workbook, sheet_name, frame)
+        workbook.close()
+        span["bytes"] = excel_buffer.tell()
+    return excel_buffer.getvalue()
+
+def excel_report_data(report_sheets):
+    """Callable for st.download_button that builds (or reuses) the workbook only when clicked."""
+    report_key = "|".join(f"{name}:{frame_digest(frame)}" for name, frame in report_sheets.items())
+    return lambda: build_excel_report(report_key, report_sheets)
+
+# === Bulk Import ===
+# Employees and attendance rows can be uploaded as CSV or XLSX. The whole
+# file is validated column-wise, compared with what is stored to preview
+# additions and changes, and applied in one write: a single employee file
+# commit or transaction, and one attendance batch through the write queue
+# (one commit per touched month in the "monthly" layout).
+
+def read_import_file(uploaded_file):
+    """Read an uploaded CSV or XLSX file with every cell as a stripped string, "" when empty."""
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        import_df = pd.read_excel(uploaded_file, dtype=str)
+    else:
+        import_df = pd.read_csv(uploaded_file, dtype=str)
+    import_df.columns = import_df.columns.astype(str).str.strip()
+    return import_df.fillna("").apply(lambda column: column.str.strip())
+
+def import_errors(import_df, columns, checks):
+    """Validation errors as (Row, Error) rows, numbered like the spreadsheet with its header on row 1.
+
+    checks are (mask, message) pairs flagging the failing rows. Missing
+    columns are reported alone, since nothing else can be checked then.
+    """
+    missing = [column for column in columns if column not in import_df.columns]
+    if missing:
+        return pd.DataFrame({"Row": [1], "Error": [f"Missing columns: {', '.join(missing)}"]})
+    errors = [pd.DataFrame({"Row": import_df.index[mask(import_df)] + 2, "Error": message}) for mask, message in checks]
+    return pd.concat(errors, ignore_index=True).sort_values("Row", kind="stable", ignore_index=True)
+
+def parse_import_dates(dates):
+    """DD/MM/YYYY strings (or the YYYY-MM-DD... text of Excel dates) as Timestamps, NaT when invalid."""
+    parsed = pd.to_datetime(dates, format="%d/%m/%Y", errors="coerce")
+    return parsed.fillna(pd.to_datetime(dates.str[:10], format="%Y-%m-%d", errors="coerce"))
+
+def normalize_import_times(times):
+    """HH:MM or HH:MM:SS strings as HH:MM:SS; invalid times become None, empty ones stay ""."""
+    padded = times.where(times.str.len() != 5, times + ":00")
+    valid = pd.to_datetime(padded, format="%H:%M:%S", errors="coerce").notna()
+    return padded.where(valid | (times == ""), None)
+
+def validate_employee_import(import_df, employee_df):
+    """Check an employee upload. Returns (errors, preview) with the preview's Change being add, update or unchanged."""
+    errors = import_errors(import_df, EMPLOYEE_COLUMNS, [
+        (lambda df: ~df["EmployeeID"].str.fullmatch(r"\d+"), "Employee ID must be numeric."),
+        (lambda df: df["EmployeeID"].duplicated(keep=False) & (df["EmployeeID"] != ""), "Employee ID appears more than once."),
+        (lambda df: (df["Name"] == "") | (df["Department"] == ""), "All fields must be filled.")
+    ])
+    if not errors.empty:
+        return errors, None
+
+    imported_df = import_df[EMPLOYEE_COLUMNS].assign(
+        Name=import_df["Name"].str.upper(),
+        Department=import_df["Department"].str.upper()
+    )
+    current_df = employee_df[EMPLOYEE_COLUMNS].astype(str)
+    preview = imported_df.merge(current_df, on="EmployeeID", how="left", suffixes=("", "Current"), indicator=True)
+    changed = (preview["Name"] != preview["NameCurrent"]) | (preview["Department"] != preview["DepartmentCurrent"])
+    preview["Change"] = "unchanged"
+    preview.loc[changed, "Change"] = "update"
+    preview.loc[preview["_merge"] == "left_only", "Change"] = "add"
+    return errors, preview[["Change", "EmployeeID", "Name", "Department", "NameCurrent", "DepartmentCurrent"]]
+
+def validate_attendance_import(import_df, employee_df, current_df):
+    """Check an attendance upload against the employees and the stored records of its dates (current_df, typed).
+
+    Returns (errors, preview) with the preview's Change being add, update or unchanged.
+    """
+    dates = parse_import_dates(import_df["Date"]) if "Date" in import_df else None
+    known = employee_df["EmployeeID"].astype(str)
+    errors = import_errors(import_df, ATTENDANCE_COLUMNS, [
+        (lambda df: dates.isna(), "Date must be DD/MM/YYYY."),
+        (lambda df: ~df["EmployeeID"].str.fullmatch(r"\d+"), "Employee ID must be numeric."),
+        (lambda df: df["EmployeeID"].str.fullmatch(r"\d+") & ~df["EmployeeID"].isin(known), "Unknown employee."),
+        (lambda df: normalize_import_times(df["ClockIn"]).isna(), "Clock In must be HH:MM or HH:MM:SS."),
+        (lambda df: normalize_import_times(df["ClockOut"]).isna(), "Clock Out must be HH:MM or HH:MM:SS."),
+        (lambda df: pd.DataFrame({"Date": dates, "EmployeeID": df["EmployeeID"]}).duplicated(keep=False) & dates.notna(),
+         "Date and employee appear more than once.")
+    ])
+    if not errors.empty:
+        return errors, None
+
+    imported_df = pd.DataFrame({
+        "Date": dates.dt.strftime("%d/%m/%Y"),
+        "EmployeeID": import_df["EmployeeID"],
+        "ClockIn": normalize_import_times(import_df["ClockIn"]),
+        "ClockOut": normalize_import_times(import_df["ClockOut"]),
+        "DailyLog": import_df["DailyLog"]
+    })
+    stored_df = format_attendance(current_df[ATTENDANCE_COLUMNS]).fillna("")
+    preview = imported_df.merge(stored_df, on=["Date", "EmployeeID"], how="left", suffixes=("", "Current"), indicator=True)
+    changed = pd.Series(False, index=preview.index)
+    for column in ATTENDANCE_COLUMNS[2:]:
+        changed |= preview[column] != preview[f"{column}Current"]
+    preview["Change"] = "unchanged"
+    preview.loc[changed, "Change"] = "update"
+    preview.loc[preview["_merge"] == "left_only", "Change"] = "add"
+    return errors, preview[["Change", *ATTENDANCE_COLUMNS, *(f"{column}Current" for column in ATTENDANCE_COLUMNS[2:])]]
+
+def attendance_import_mutations(preview):
+    """Upsert mutations for the added and changed rows of an attendance preview; empty fields are stored as null."""
+    changes = preview.loc[preview["Change"] != "unchanged", ATTENDANCE_COLUMNS]
+    records = dataframe_to_records(changes.where(changes != "", None))
+    return [{"Event": "upsert", **record} for record in records]
+
+# === Employee Index ===
+# Employee pickers do not send the whole roster to the browser. A search
+# box offers the top EMPLOYEE_SEARCH_LIMIT matches by ID, name or
+# department, from an index built once per version of the employee list
+# (the file sha on GitHub): display names, the sorted words of every
+# employee for prefix lookups by binary search, and the text scanned for
+# substrings when prefixes do not find enough.
+
+def build_employee_index(employee_df):
+    """Search index over an employee frame, see search_employees()."""
+    employees = employee_df.reset_index(drop=True)
+    employees["DisplayName"] = employees["EmployeeID"].astype(str) + " - " + employees["Name"].astype(str)
+    ids = employees["EmployeeID"].astype(str)
+    names = employees["Name"].astype(str).str.lower()
+    departments = employees["Department"].astype(str).str.lower()
+    words = pd.concat([ids, names.str.split().explode(), departments.str.split().explode()]).dropna()
+    return {
+        "employees": employees,
+        "words": words.astype(str).sort_values(kind="stable"),
+        "text": ids + " " + names + " " + departments,
+        "departments": sorted(employees["Department"].astype(str).unique())
+    }
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_employee_index(version, _load_employees):
+    """The employee index for a version of the employee list, built from _load_employees() only when it is new."""
+    with perf_span("employees.index"):
+        return build_employee_index(_load_employees())
+
+def rows_containing(text, terms):
+    """Boolean mask of the text entries containing every term."""
+    mask = pd.Series(True, index=text.index)
+    for term in terms:
+        mask &= text.str.contains(term, regex=False)
+    return mask
+
+def search_employees(employee_index, query, limit=EMPLOYEE_SEARCH_LIMIT):
+    """Up to limit employees matching every word of query, in roster order.
+
+    Employees with a word starting with the first query word come first;
+    the rest of the roster is only scanned when they are fewer than limit.
+    An empty query gives the start of the roster.
+    """
+    employees = employee_index["employees"]
+    terms = query.lower().split()
+    if not terms:
+        return employees.head(limit)
+
+    words = employee_index["words"]
+    start, end = words.searchsorted([terms[0], terms[0] + "\uffff"])
+    prefix_rows = words.index[start:end].unique().sort_values()
+    prefix_text = employee_index["text"].loc[prefix_rows]
+    rows = prefix_text.index[rows_containing(prefix_text, terms[1:])]
+    if len(rows) < limit:
+        text = employee_index["text"]
+        rows = rows.append(text.index[rows_containing(text, terms)].difference(rows))
+    return employees.loc[rows[:limit]]
+
+def select_employee(employee_index, label, key):
+    """A search box and a selectbox of its top matches. Returns the chosen display name.
+
+    The selectbox has no key, so it starts over at the best match whenever the matches change.
+    """
+    query = st.text_input("🔎 Search Employee", key=key, placeholder="ID, name or department")
+    return st.selectbox(label, search_employees(employee_index, query)["DisplayName"])
+
+def filter_employee(employee_index, label, key):
+    """A search box and a selectbox of "(All)" and its top matches. Returns the chosen EmployeeID, or None for all.
+
+    The best match is picked as soon as something is typed.
+    """
+    query = st.text_input(label, key=key, placeholder="ID, name or department")
+    matches = search_employees(employee_index, query)
+    options = ["(All)"] + matches["DisplayName"].tolist()
+    choice = st.selectbox("Employee", options, index=1 if query.strip() and len(matches) else 0)
+    if choice == "(All)":
+        return None
+    return matches.loc[matches["DisplayName"] == choice, "EmployeeID"].iloc[0]
+
+# === Sites ===
+# With SITES configured, the Dashboard can report on every site at once.
+# Each site is a repository, read through the same GitHub functions with
+# its own file cache (so unchanged files are reused by sha per site), or a
+# SQLite database. The sites are loaded at the same time, so the report
+# takes about as long as the slowest one.
+
+@st.cache_resource
+def get_site_pool():
+    """Process-wide thread pool loading the sites of SITES at the same time."""
+    return ThreadPoolExecutor(max_workers=max(len(SITES), 1), thread_name_prefix="site-fetch")
+
+@st.cache_resource
+def get_site_store(location):
+    """Storage of a site: a SQLiteStore for a database path, else a GitHubStore to use inside github_repository()."""
+    return SQLiteStore(location) if location.endswith(".db") else GitHubStore()
+
+def load_site_report(location, start_date=None, end_date=None):
+    """A site's attendance between the dates with employee names, departments and signatures."""
+    store = get_site_store(location)
+    with github_repository(None if location.endswith(".db") else location):
+        store.preload(attendance=True)
+        employee_df = store.load_employees()
+        attendance_df = store.load_attendance(start_date, end_date)
+        signatures_df = store.load_signatures()
+    report_df = pd.merge(attendance_df, employee_df[["EmployeeID", "Name", "Department"]], on="EmployeeID", how="left")
+    report_df["Sign"] = signature_mask(report_df, signatures_df).map({True: SIGNATURE_TEXT, False: ""})
+    return report_df.assign(EmployeeID=report_df["EmployeeID"].astype(str), Department=report_df["Department"].astype(str))
+
+def load_sites_report(start_date=None, end_date=None):
+    """The reports of every site in SITES, loaded concurrently, as one frame with a Site column first.
+
+    Also returns a frame of each site's employee and record counts and load time.
+    """
+    def load(site):
+        start = time.perf_counter()
+        with perf_span("site.load", site=site) as span:
+            report_df = load_site_report(SITES[site], start_date, end_date)
+            span["rows"] = len(report_df)
+        return report_df, {"Site": site, "Employees Present": report_df["EmployeeID"].nunique(), "Records": len(report_df),
+                           "Load ms": round((time.perf_counter() - start) * 1000)}
+
+    with perf_span("sites.load", sites=len(SITES)):
+        results = map_in_context(get_site_pool(), load, list(SITES))
+    reports = [report_df.assign(Site=site) for site, (report_df, _) in zip(SITES, results)]
+    sites_df = pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(columns=["Site"])
+    sites_df.insert(0, "Site", sites_df.pop("Site"))
+    return sites_df, pd.DataFrame([stats for _, stats in results])
+
+# === Page Data ===
+# Each page loads only what it shows, once it is past its PIN screen: Clock
+# In / Out the employee list (records are looked up one at a time on a
+# punch), the Dashboard the attendance of the periods it displays, and
+# Manage User the per-month summary.
+
+def load_page_employees(attendance=False, summary=False):
+    """The employee index, fetched together with the other files the page reads.
+
+    Its "employees" frame (with display names) is shared, so pages must not edit it in place.
+    """
+    storage = get_storage()
+    storage.preload(attendance=attendance, summary=summary)
+    return storage.load_employee_index()
+
+# === UI Setup ===
+st.set_page_config(page_title="Employee Attendance System", layout="centered")
 
 # Sidebar navigation
 selected_page = st.sidebar.selectbox(
@@ -77,17 +2348,30 @@ selected_page = st.sidebar.selectbox(
     ["Clock In / Out", "Dashboard", "Manage User"]
 )
 
+# Pages load their own data, see load_page_employees()
+start_perf_trace(selected_page)
+storage = get_storage()
+current_date, current_time = get_current_time()
+
 # === Clock In/Out Page ===
 if selected_page == "Clock In / Out":
     st.title("✨ LOGIC Attendance")
     st.markdown("---")
     st.markdown(f"**Date (GMT+7):** {current_date}")
     st.markdown(f"**Time (GMT+7):** {current_time}")
+    if KIOSK_MODE and get_kiosk_queue().pending_count():
+        st.caption(f"📤 {get_kiosk_queue().pending_count()} punches waiting to sync")
     st.markdown("---")
     
-    selected_employee = st.selectbox("Select Employee", employee_df["DisplayName"])
-    employee_id = int(selected_employee.split(" - ")[0])
-    employee_id_str = str(employee_id)
+    employee_index = load_page_employees()
+    selected_employee = select_employee(employee_index, "Select Employee", "clock_employee_search")
+    if employee_index["employees"].empty:
+        st.info("No employees yet. Add them on the Manage User page.")
+        st.stop()
+    elif selected_employee is None:
+        st.info("No employees match the search.")
+        st.stop()
+    employee_id = selected_employee.split(" - ")[0]
 
     if "attendance_action_state" not in st.session_state:
         st.session_state.attendance_action_state = ""
@@ -96,61 +2380,59 @@ if selected_page == "Clock In / Out":
     
     # Clock In Button
     if st.button("✅ Clock In"):
-        already_clocked_in = attendance_df[
-            (attendance_df["Date"] == current_date) &
-            (attendance_df["EmployeeID"].astype(str) == employee_id_str)
-        ]
-        
-        if not already_clocked_in.empty:
+        set_perf_action("clock_in")
+        new_attendance = {
+            "Event": "upsert",
+            "Require": "absent",
+            "Date": current_date,
+            "EmployeeID": employee_id,
+            "ClockIn": current_time,
+            "ClockOut": None,
+            "DailyLog": None
+        }
+
+        if KIOSK_MODE and get_kiosk_queue().pending_changes(current_date, employee_id):
+            # Only queued punches are checked, to stay off the network; a clock-in
+            # that already synced makes this one be rejected (and dropped) when it syncs
+            result = "rejected"
+        else:
+            result = record_punch(new_attendance)
+        if result in ["saved", "queued"]:
+            st.success("✅ Clock in successful.")
+            st.rerun()
+        elif result == "rejected":
             st.error("⚠️ You have already clocked in today.")
         else:
-            new_attendance = pd.DataFrame([{
-                "Date": current_date,
-                "EmployeeID": employee_id,
-                "ClockIn": current_time,
-                "ClockOut": None,
-                "DailyLog": None
-            }])
-            
-            updated_attendance = pd.concat([attendance_df, new_attendance], ignore_index=True)
-            
-            if update_github_json(FILE_PATHS["attendance"], updated_attendance.to_dict(orient="records"), attendance_sha):
-                attendance_data, attendance_sha = fetch_github_json(FILE_PATHS["attendance"])
-                attendance_df = pd.DataFrame(attendance_data)
-                st.success("✅ Clock in successful.")
-                st.rerun()
-            else:
-                st.error("❌ Failed to save clock in data.")
+            st.error("❌ Failed to save clock in data.")
 
     # Clock Out Button
     if st.button("🔚 Clock Out"):
-        today_attendance = attendance_df[
-            (attendance_df["Date"] == current_date) &
-            (attendance_df["EmployeeID"].astype(str) == employee_id_str)
-        ]
+        set_perf_action("clock_out")
+        today_attendance = find_punch_record(current_date, employee_id)
         
-        if not today_attendance.empty:
-            idx = today_attendance.index[0]
-            if pd.notna(today_attendance.at[idx, "ClockOut"]):
+        if today_attendance is not None:
+            if pd.notna(today_attendance["ClockOut"]):
                 st.warning("⚠️ You have already clocked out today.")
-            elif pd.isna(today_attendance.at[idx, "ClockIn"]):
+            elif pd.isna(today_attendance["ClockIn"]):
                 st.session_state.attendance_action_state = "manual_entry"
             else:
                 st.session_state.attendance_action_state = "complete_clockout"
         else:
-            new_attendance = pd.DataFrame([{
+            new_attendance = {
+                "Event": "upsert",
+                "Require": "absent",
                 "Date": current_date,
                 "EmployeeID": employee_id,
                 "ClockIn": None,
                 "ClockOut": current_time,
                 "DailyLog": None
-            }])
-            
-            updated_attendance = pd.concat([attendance_df, new_attendance], ignore_index=True)
+            }
             
-            if update_github_json(FILE_PATHS["attendance"], updated_attendance.to_dict(orient="records"), attendance_sha):
+            if record_punch(new_attendance) in ["saved", "queued"]:
                 st.session_state.attendance_action_state = "manual_entry"
                 st.rerun()
+            else:
+                st.error("❌ Failed to save clock out data.")
 
     # Handle clock out with daily log
     if st.session_state.attendance_action_state == "complete_clockout":
@@ -159,21 +2441,23 @@ if selected_page == "Clock In / Out":
         daily_log = st.text_area("Daily Log", key="log_update", max_chars=150)
         
         if st.button("Submit Clock Out"):
+            set_perf_action("submit_clock_out")
             if daily_log.strip():
-                today_attendance = attendance_df[
-                    (attendance_df["Date"] == current_date) &
-                    (attendance_df["EmployeeID"] == employee_id)
-                ]
+                clock_out = {
+                    "Event": "upsert",
+                    "Require": "present",
+                    "Date": current_date,
+                    "EmployeeID": employee_id,
+                    "ClockOut": current_time,
+                    "DailyLog": daily_log
+                }
                 
-                if not today_attendance.empty:
-                    idx = today_attendance.index[0]
-                    attendance_df.at[idx, "ClockOut"] = current_time
-                    attendance_df.at[idx, "DailyLog"] = daily_log
-                    
-                    if update_github_json(FILE_PATHS["attendance"], attendance_df.to_dict(orient="records"), attendance_sha):
-                        st.success("✅ Attendance completed successfully.")
-                        st.session_state.attendance_action_state = ""
-                        st.rerun()
+                if record_punch(clock_out) in ["saved", "queued"]:
+                    st.success("✅ Attendance completed successfully.")
+                    st.session_state.attendance_action_state = ""
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to save clock out data.")
             else:
                 st.error("Daily log cannot be empty.")
 
@@ -186,22 +2470,24 @@ if selected_page == "Clock In / Out":
         daily_log = st.text_area("Daily Log", key="log_manual", max_chars=150)
 
         if st.button("Submit Full Attendance"):
+            set_perf_action("submit_full_attendance")
             if daily_log.strip():
-                today_attendance = attendance_df[
-                    (attendance_df["Date"] == current_date) &
-                    (attendance_df["EmployeeID"] == employee_id)
-                ]
+                full_attendance = {
+                    "Event": "upsert",
+                    "Require": "present",
+                    "Date": current_date,
+                    "EmployeeID": employee_id,
+                    "ClockIn": manual_time,
+                    "ClockOut": current_time,
+                    "DailyLog": daily_log
+                }
                 
-                if not today_attendance.empty:
-                    idx = today_attendance.index[0]
-                    attendance_df.at[idx, "ClockIn"] = manual_time
-                    attendance_df.at[idx, "ClockOut"] = current_time
-                    attendance_df.at[idx, "DailyLog"] = daily_log
-                    
-                    if update_github_json(FILE_PATHS["attendance"], attendance_df.to_dict(orient="records"), attendance_sha):
-                        st.success("✅ Attendance completed successfully.")
-                        st.session_state.attendance_action_state = ""
-                        st.rerun()
+                if record_punch(full_attendance) in ["saved", "queued"]:
+                    st.success("✅ Attendance completed successfully.")
+                    st.session_state.attendance_action_state = ""
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to save clock out data.")
             else:
                 st.error("Daily log cannot be empty.")
 
@@ -221,18 +2507,29 @@ elif selected_page == "Dashboard":
         elif pin_input:
             st.error("❌ Incorrect PIN.")
     else:
-        if "signatures" not in st.session_state:
-            st.session_state.signatures = {}
         st.title("📋 Attendance Dashboard")
+        employee_index = load_page_employees(attendance=True)
+        employee_df = employee_index["employees"]
+        if employee_df.empty:
+            st.info("No employees yet. Add them on the Manage User page.")
+            st.stop()
+
+        # Fold old event log segments into the snapshot once enough have piled up
+        if STORAGE_BACKEND == "github" and ATTENDANCE_STORAGE == "events":
+            closed_segments = len(list_github_directory(FILE_PATHS["attendance_events"])) - 1
+            if closed_segments > EVENT_LOG_COMPACT_AFTER and compact_attendance_events():
+                st.rerun()
         
         # Attendance Record Editor
         st.markdown("---")
         st.subheader("🛠 Edit Attendance Records")
         
+        # The search box sits outside the form so the choices follow it as it is typed
+        edit_search = st.text_input("🔎 Search Employee", key="edit_employee_search", placeholder="ID, name or department")
         with st.form("attendance_editor_form"):
             edit_date = st.date_input("Date", format="DD/MM/YYYY")
-            edit_employee = st.selectbox("Select Employee", employee_df["DisplayName"])
-            edit_employee_id = edit_employee.split(" - ")[0]
+            edit_employee = st.selectbox("Select Employee", search_employees(employee_index, edit_search)["DisplayName"])
+            edit_employee_id = edit_employee.split(" - ")[0] if edit_employee else None
 
             col1, col2 = st.columns(2)
             with col1:
@@ -248,13 +2545,13 @@ elif selected_page == "Dashboard":
 
             formatted_date = edit_date.strftime("%d/%m/%Y")
 
-            if save_button:
-                existing_record = attendance_df[
-                    (attendance_df["Date"] == formatted_date) &
-                    (attendance_df["EmployeeID"].astype(str) == edit_employee_id)
-                ].index
+            if (save_button or delete_button) and edit_employee_id is None:
+                st.error("❌ No employees match the search.")
 
+            elif save_button:
+                set_perf_action("save_record")
                 new_record = {
+                    "Event": "upsert",
                     "Date": formatted_date,
                     "EmployeeID": edit_employee_id,
                     "ClockIn": edit_clock_in.strftime("%H:%M:%S") if edit_clock_in else None,
@@ -262,78 +2559,154 @@ elif selected_page == "Dashboard":
                     "DailyLog": edit_daily_log
                 }
 
-                if not existing_record.empty:
-                    attendance_df.loc[existing_record[0]] = new_record
-                else:
-                    attendance_df = pd.concat([attendance_df, pd.DataFrame([new_record])], ignore_index=True)
-
-                if update_github_json(FILE_PATHS["attendance"], attendance_df.to_dict(orient="records"), attendance_sha):
+                if get_write_queue().submit(new_record) == "saved":
                     st.success("✅ Record successfully saved.")
                     st.rerun()
                 else:
-                    st.error("❌ Failed to save to GitHub.")
+                    st.error("❌ Failed to save changes.")
 
             elif delete_button:
-                existing_record = attendance_df[
-                    (attendance_df["Date"] == formatted_date) &
-                    (attendance_df["EmployeeID"].astype(str) == edit_employee_id)
-                ].index
-                
-                if not existing_record.empty:
-                    attendance_df.drop(existing_record, inplace=True)
-                    
-                    if update_github_json(FILE_PATHS["attendance"], attendance_df.to_dict(orient="records"), attendance_sha):
-                        st.success("✅ Record successfully deleted.")
+                set_perf_action("delete_record")
+                result = get_write_queue().submit({
+                    "Event": "delete",
+                    "Require": "present",
+                    "Date": formatted_date,
+                    "EmployeeID": edit_employee_id
+                })
+                if result == "saved":
+                    st.success("✅ Record successfully deleted.")
+                    st.rerun()
+                elif result == "rejected":
+                    st.warning("⚠️ Record not found.")
+                else:
+                    st.error("❌ Failed to save changes.")
+
+        # Bulk attendance import
+        st.markdown("---")
+        st.subheader("📥 Import Attendance")
+        attendance_file = st.file_uploader("CSV or XLSX with Date, EmployeeID, ClockIn, ClockOut and DailyLog columns", type=["csv", "xlsx"], key="attendance_import")
+        if attendance_file is not None:
+            import_df = read_import_file(attendance_file)
+            import_dates = parse_import_dates(import_df["Date"]).dropna() if "Date" in import_df else pd.Series(dtype="datetime64[s]")
+            current_df = storage.load_attendance(import_dates.min().date(), import_dates.max().date()) if len(import_dates) else empty_attendance()
+            import_errors_df, import_preview = validate_attendance_import(import_df, employee_df, current_df)
+            if not import_errors_df.empty:
+                st.error(f"❌ {len(import_errors_df)} problems found, nothing was imported.")
+                st.dataframe(import_errors_df, hide_index=True)
+            else:
+                change_counts = import_preview["Change"].value_counts()
+                st.info(f"{change_counts.get('add', 0)} to add, {change_counts.get('update', 0)} to update, {change_counts.get('unchanged', 0)} unchanged.")
+                st.dataframe(import_preview, hide_index=True)
+                if st.button("Apply Attendance Import"):
+                    set_perf_action("import_attendance")
+                    mutations = attendance_import_mutations(import_preview)
+                    if not mutations:
+                        st.info("Nothing to import.")
+                    elif set(get_write_queue().submit_batch(mutations)) == {"saved"}:
+                        st.success(f"✅ {len(mutations)} records imported.")
                         st.rerun()
                     else:
-                        st.error("❌ Failed to save to GitHub.")
-                else:
-                    st.warning("⚠️ Record not found.")
+                        st.error("❌ Failed to save changes.")
 
         # Attendance Report
         st.markdown("---")
         st.subheader("📅 Attendance Report")
 
         # Create employee lookup table
-        employee_lookup = employee_df.copy()
-        employee_lookup["EmployeeID"] = employee_lookup["EmployeeID"].astype(str)
+        employee_lookup = employee_df[["EmployeeID", "Name"]]
+
+        # Report period, only the months overlapping it are loaded. It starts at the
+        # current month; clearing it loads the full history.
+        today = datetime.now(pytz.timezone(TIMEZONE)).date()
+        report_period = st.date_input("📆 Filter by Date Range", value=(today.replace(day=1), today), format="DD/MM/YYYY")
+        report_start, report_end = (tuple(report_period) + (None, None))[:2]
+        if report_start is not None and report_end is None:
+            report_end = report_start
 
         # Create display dataframe with employee names
-        report_df = attendance_df.copy()
-        report_df["EmployeeID"] = report_df["EmployeeID"].astype(str)
-        report_df = pd.merge(report_df, employee_lookup[["EmployeeID", "Name"]], on="EmployeeID", how="left")
+        report_df = storage.load_attendance(report_start, report_end)
+        with perf_span("report.merge", rows=len(report_df)):
+            report_df = pd.merge(report_df, employee_lookup, on="EmployeeID", how="left")
 
         # Report filters
-        name_filter = st.selectbox("🔎 Filter by Name", ["(All)"] + sorted(employee_df["Name"].unique()))
-        department_filter = st.selectbox("🏢 Filter by Department", ["(All)"] + sorted(employee_df["Department"].unique()))
+        employee_filter = filter_employee(employee_index, "🔎 Filter by Name", "report_employee_search")
+        department_filter = st.selectbox("🏢 Filter by Department", ["(All)"] + employee_index["departments"])
 
-        if name_filter != "(All)":
-            report_df = report_df[report_df["Name"] == name_filter]
+        if employee_filter is not None:
+            report_df = report_df[report_df["EmployeeID"] == employee_filter]
             
         if department_filter != "(All)":
             dept_employees = employee_df[employee_df["Department"] == department_filter]
-            dept_employee_ids = dept_employees["EmployeeID"].astype(str).unique()
+            dept_employee_ids = dept_employees["EmployeeID"].unique()
             report_df = report_df[report_df["EmployeeID"].isin(dept_employee_ids)]
 
-        report_display_df = report_df[["Date", "EmployeeID", "Name", "ClockIn", "ClockOut", "DailyLog"]]
+        report_display_df = report_df[["Date", "EmployeeID", "Name", "ClockIn", "ClockOut", "DailyLog"]].copy()
 
         # Add Sign column
-        report_display_df["Sign"] = report_display_df.apply(lambda x: "Disetujui & Ditandatangi elektronik oleh : Site Supervisor via Sistem clockin.streamlit.app" if x["EmployeeID"] in st.session_state.signatures else "", axis=1)
+        signatures_df = storage.load_signatures()
+        report_display_df["Sign"] = signature_mask(report_display_df, signatures_df).map({True: SIGNATURE_TEXT, False: ""})
 
-        # Excel download functionality
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            report_display_df.to_excel(writer, index=False, sheet_name='Attendance')
-        excel_buffer.seek(0)
+        # Timesheet for the same records, against the configured schedule
+        with st.expander("⏱ Timesheet Settings"):
+            col1, col2 = st.columns(2)
+            with col1:
+                shift_start = st.time_input("Shift Start", value=datetime.strptime(SHIFT_START, "%H:%M:%S").time())
+                rounding_minutes = st.selectbox(
+                    "Round Worked Time To (minutes)", [1, 5, 15, 30, 60],
+                    index=[1, 5, 15, 30, 60].index(TIMESHEET_ROUNDING_MINUTES)
+                )
+            with col2:
+                shift_end = st.time_input("Shift End", value=datetime.strptime(SHIFT_END, "%H:%M:%S").time())
+                timesheet_period = st.selectbox("Timesheet Period", ["Month", "Week"])
+
+        timesheet_df = summarize_timesheet(
+            compute_timesheet(
+                report_df,
+                pd.Timedelta(shift_start.strftime("%H:%M:%S")),
+                pd.Timedelta(shift_end.strftime("%H:%M:%S")),
+                pd.Timedelta(minutes=rounding_minutes)
+            ),
+            "M" if timesheet_period == "Month" else "W"
+        )
+        timesheet_df = pd.merge(timesheet_df, employee_lookup, on="EmployeeID", how="left")
+        timesheet_df.insert(2, "Name", timesheet_df.pop("Name"))
 
+        # Excel download functionality, the workbook is only built when the button is pressed
         st.download_button(
             label="📥 Download Excel Report (.xlsx)",
-            data=excel_buffer,
+            data=excel_report_data({"Attendance": report_display_df, "Timesheet": timesheet_df}),
             file_name="EmployeeAttendanceReport.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
 
-        st.dataframe(report_display_df)
+        st.dataframe(format_attendance(report_display_df))
+
+        st.markdown("**⏱ Timesheet**")
+        timesheet_display_df = timesheet_df.copy()
+        timesheet_display_df["Period"] = timesheet_df["Period"].dt.strftime("%d/%m/%Y")
+        for column in ["Worked", "Overtime", "Late", "EarlyLeave"]:
+            timesheet_display_df[column] = format_durations(timesheet_df[column])
+        st.dataframe(timesheet_display_df)
+
+        # All Sites Report, every site of SITES loaded at the same time
+        if SITES:
+            st.markdown("---")
+            st.subheader("🌐 All Sites Report")
+            sites_period = st.date_input("📆 Sites Date Range", value=(today.replace(day=1), today), format="DD/MM/YYYY")
+            sites_start, sites_end = (tuple(sites_period) + (None, None))[:2]
+            if sites_start is not None and sites_end is None:
+                sites_end = sites_start
+
+            sites_report_df, sites_stats_df = load_sites_report(sites_start, sites_end)
+            sites_report_df = sites_report_df[["Site", "Date", "EmployeeID", "Name", "Department", "ClockIn", "ClockOut", "DailyLog", "Sign"]]
+            st.dataframe(sites_stats_df, hide_index=True)
+            st.download_button(
+                label="📥 Download All Sites Report (.xlsx)",
+                data=excel_report_data({"All Sites": sites_report_df}),
+                file_name="AllSitesAttendanceReport.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+            st.dataframe(format_attendance(sites_report_df), hide_index=True)
 
         # Batch Signature Section
         st.markdown("---")
@@ -352,7 +2725,7 @@ elif selected_page == "Dashboard":
                 end_date = st.date_input("End Date")
         
         if st.button("Add Signatures for Selected Period"):
-            # Convert dates to the format used in attendance records (DD/MM/YYYY)
+            set_perf_action("add_period_signatures")
             if period_type == "Last Week":
                 end_date = datetime.now(pytz.timezone(TIMEZONE))
                 start_date = end_date - pd.Timedelta(days=7)
@@ -360,28 +2733,19 @@ elif selected_page == "Dashboard":
                 end_date = datetime.now(pytz.timezone(TIMEZONE))
                 start_date = end_date - pd.Timedelta(days=30)
             
-            # Convert to string format
-            start_date_str = start_date.strftime("%d/%m/%Y")
-            end_date_str = end_date.strftime("%d/%m/%Y")
-            
-            # Filter records by date range
-            mask = pd.to_datetime(report_df["Date"], format="%d/%m/%Y").between(
-                pd.to_datetime(start_date_str, format="%d/%m/%Y"),
-                pd.to_datetime(end_date_str, format="%d/%m/%Y")
-            )
+            # Load the records of the range, which may lie outside the report period
+            period_records = storage.load_attendance(start_date, end_date)
             
-            period_records = report_df[mask]
-            
-            # Add signatures for all records in range
-            for emp_id in period_records["EmployeeID"].unique():
-                st.session_state.signatures[emp_id] = True
-            
-            total_signed = len(period_records["EmployeeID"].unique())
-            st.success(f"✅ Added signatures for {total_signed} employees in selected period")
-            st.rerun()
+            # Sign the range for every employee with records in it
+            period_employee_ids = period_records["EmployeeID"].astype(str).unique()
+            if storage.sign_attendance(period_employee_ids, start_date, end_date):
+                st.success(f"✅ Added signatures for {len(period_employee_ids)} employees in selected period")
+                st.rerun()
+            else:
+                st.error("❌ Failed to save changes.")
 
         if st.button("Remove Signatures for Selected Period"):
-            # Convert dates to the format used in attendance records (DD/MM/YYYY)
+            set_perf_action("remove_period_signatures")
             if period_type == "Last Week":
                 end_date = datetime.now(pytz.timezone(TIMEZONE))
                 start_date = end_date - pd.Timedelta(days=7)
@@ -389,37 +2753,20 @@ elif selected_page == "Dashboard":
                 end_date = datetime.now(pytz.timezone(TIMEZONE))
                 start_date = end_date - pd.Timedelta(days=30)
             
-            # Convert to string format
-            start_date_str = start_date.strftime("%d/%m/%Y")
-            end_date_str = end_date.strftime("%d/%m/%Y")
-            
-            # Filter records by date range
-            mask = pd.to_datetime(report_df["Date"], format="%d/%m/%Y").between(
-                pd.to_datetime(start_date_str, format="%d/%m/%Y"),
-                pd.to_datetime(end_date_str, format="%d/%m/%Y")
-            )
-            
-            period_records = report_df[mask]
+            # Load the records of the range, which may lie outside the report period
+            period_records = storage.load_attendance(start_date, end_date)
             
-            # Remove signatures for all records in range
-            removed_count = 0
-            for emp_id in period_records["EmployeeID"].unique():
-                if emp_id in st.session_state.signatures:
-                    st.session_state.signatures.pop(emp_id)
-                    removed_count += 1
+            # Unsign the range for every employee with signed records in it
+            signed_records = period_records[signature_mask(period_records, signatures_df)]
+            removed_employee_ids = signed_records["EmployeeID"].astype(str).unique()
             
-            if removed_count > 0:
-                st.success(f"✅ Removed signatures for {removed_count} employees in selected period")
-            else:
+            if len(removed_employee_ids) == 0:
                 st.info("ℹ️ No signatures found for the selected period")
-            st.rerun()
-
-
-        # Display current signature status
-        signed_employees = pd.DataFrame([
-            {"EmployeeID": emp_id, "Status": "Signed"} 
-            for emp_id in st.session_state.signatures.keys()
-        ])
+            elif storage.sign_attendance(removed_employee_ids, start_date, end_date, signed=False):
+                st.success(f"✅ Removed signatures for {len(removed_employee_ids)} employees in selected period")
+                st.rerun()
+            else:
+                st.error("❌ Failed to save changes.")
 
         # Add/Remove Signature Section
         st.markdown("---")
@@ -427,36 +2774,56 @@ elif selected_page == "Dashboard":
 
         # Date selection
         sign_date = st.date_input("Select Date", format="DD/MM/YYYY")
-        formatted_sign_date = sign_date.strftime("%d/%m/%Y")
 
         # Get employees for selected date
-        date_records = report_df[report_df["Date"] == formatted_sign_date]
+        date_records = pd.merge(
+            storage.load_attendance(sign_date, sign_date),
+            employee_df[["EmployeeID", "Name", "Department"]],
+            on="EmployeeID",
+            how="left"
+        )
         if not date_records.empty:
-            # Employee selection
-            employees_on_date = date_records.copy()
-            employees_on_date["Status"] = employees_on_date["EmployeeID"].apply(
-                lambda x: "✅ Signed" if x in st.session_state.signatures else "❌ Not Signed"
-            )
-            
+            signed = signature_mask(date_records, signatures_df)
+
+            # The grid starts from the current signatures, everyone or no one, with whole departments ticked on top
+            col1, col2 = st.columns(2)
+            with col1:
+                preselect = st.radio("Start From", ["Current Signatures", "All Employees", "No Employees"], horizontal=True)
+            with col2:
+                preselect_departments = st.multiselect("Select by Department", sorted(date_records["Department"].dropna().astype(str).unique()))
+
+            sign_grid = pd.DataFrame({
+                "Sign": signed if preselect == "Current Signatures" else preselect == "All Employees",
+                "EmployeeID": date_records["EmployeeID"].astype(str),
+                "Name": date_records["Name"],
+                "Department": date_records["Department"].astype(str)
+            })
+            sign_grid["Sign"] |= sign_grid["Department"].isin(preselect_departments)
+
             st.markdown("### Employees Present on Selected Date")
-            # Display employees with signature status
-            for _, row in employees_on_date.iterrows():
-                col1, col2, col3 = st.columns([2, 1, 1])
-                with col1:
-                    st.text(f"{row['EmployeeID']} - {row['Name']}")
-                with col2:
-                    st.text(row['Status'])
-                with col3:
-                    if row["EmployeeID"] in st.session_state.signatures:
-                        if st.button("Remove Sign", key=f"remove_{row['EmployeeID']}"):
-                            st.session_state.signatures.pop(row["EmployeeID"])
-                            st.success(f"✅ Removed signature for {row['Name']}")
-                            st.rerun()
-                    else:
-                        if st.button("Add Sign", key=f"add_{row['EmployeeID']}"):
-                            st.session_state.signatures[row["EmployeeID"]] = True
-                            st.success(f"✅ Added signature for {row['Name']}")
-                            st.rerun()
+            st.caption(f"✅ {signed.sum()} of {len(signed)} signed")
+            # Ticking boxes inside the form does not rerun the page; the changes are applied together
+            with st.form("signature_editor_form"):
+                edited_grid = st.data_editor(
+                    sign_grid,
+                    hide_index=True,
+                    disabled=["EmployeeID", "Name", "Department"],
+                    key=f"signature_editor_{sign_date}_{preselect}_{'|'.join(preselect_departments)}"
+                )
+                apply_button = st.form_submit_button("Apply Signatures")
+
+            if apply_button:
+                set_perf_action("apply_signatures")
+                changed = edited_grid["Sign"].to_numpy() != signed.to_numpy()
+                changed_ids = edited_grid["EmployeeID"][changed]
+                changed_signs = edited_grid["Sign"][changed].tolist()
+                if not changed.any():
+                    st.info("ℹ️ No signature changes to apply")
+                elif storage.sign_attendance(changed_ids, sign_date, sign_date, signed=changed_signs):
+                    st.success(f"✅ Added {sum(changed_signs)} and removed {changed.sum() - sum(changed_signs)} signatures")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to save changes.")
         else:
             st.info("No attendance records found for selected date")
 
@@ -482,6 +2849,8 @@ elif selected_page == "Manage User":
     else:
         st.success("✅ Logged in as Administrator")
         st.markdown("---")
+        employee_index = load_page_employees(summary=True)
+        employee_df = employee_index["employees"]
         
         # Add new employee
         st.subheader("➕ Add New Employee")
@@ -492,6 +2861,7 @@ elif selected_page == "Manage User":
             add_button = st.form_submit_button("Add Employee")
 
             if add_button:
+                set_perf_action("add_employee")
                 if not new_employee_id.isdigit():
                     st.error("❌ Employee ID must be numeric.")
                 elif new_employee_id in employee_df["EmployeeID"].astype(str).values:
@@ -499,58 +2869,80 @@ elif selected_page == "Manage User":
                 elif not new_employee_name.strip() or not new_employee_dept.strip():
                     st.error("❌ All fields must be filled.")
                 else:
-                    new_employee = pd.DataFrame([{
+                    new_employee = {
                         "EmployeeID": new_employee_id,
                         "Name": new_employee_name.strip().upper(),
                         "Department": new_employee_dept.strip().upper()
-                    }])
+                    }
                     
-                    updated_employee_df = pd.concat([employee_df, new_employee], ignore_index=True)
-                    
-                    if update_github_json(FILE_PATHS["employee"], updated_employee_df.to_dict(orient="records"), employee_sha):
+                    if storage.save_employee(new_employee):
                         st.success("✅ Employee added successfully.")
                         st.rerun()
                     else:
-                        st.error("❌ Failed to save to GitHub.")
+                        st.error("❌ Failed to save changes.")
 
         # Delete employee
         st.markdown("---")
         st.subheader("🗑 Remove Employee")
-        employee_df["DisplayName"] = employee_df["EmployeeID"].astype(str) + " - " + employee_df["Name"]
-        employee_to_delete = st.selectbox("Select Employee to Remove", employee_df["DisplayName"])
-        employee_id_to_delete = employee_to_delete.split(" - ")[0]
+        employee_to_delete = select_employee(employee_index, "Select Employee to Remove", "remove_employee_search")
 
-        if st.button("Remove Selected Employee"):
+        if st.button("Remove Selected Employee") and employee_to_delete is not None:
+            set_perf_action("remove_employee")
+            employee_id_to_delete = employee_to_delete.split(" - ")[0]
             employee_name = employee_df[employee_df["EmployeeID"].astype(str) == employee_id_to_delete]["Name"].values[0]
-            updated_employee_df = employee_df[employee_df["EmployeeID"].astype(str) != employee_id_to_delete]
             
-            if update_github_json(FILE_PATHS["employee"], updated_employee_df.to_dict(orient="records"), employee_sha):
+            if storage.delete_employee(employee_id_to_delete):
                 st.success(f"✅ Employee '{employee_name}' (ID: {employee_id_to_delete}) has been removed.")
                 st.rerun()
             else:
-                st.error("❌ Failed to save to GitHub.")
+                st.error("❌ Failed to save changes.")
+
+        # Bulk employee import
+        st.markdown("---")
+        st.subheader("📥 Import Employees")
+        employee_file = st.file_uploader("CSV or XLSX with EmployeeID, Name and Department columns", type=["csv", "xlsx"], key="employee_import")
+        if employee_file is not None:
+            import_errors_df, import_preview = validate_employee_import(read_import_file(employee_file), employee_df)
+            if not import_errors_df.empty:
+                st.error(f"❌ {len(import_errors_df)} problems found, nothing was imported.")
+                st.dataframe(import_errors_df, hide_index=True)
+            else:
+                change_counts = import_preview["Change"].value_counts()
+                st.info(f"{change_counts.get('add', 0)} to add, {change_counts.get('update', 0)} to update, {change_counts.get('unchanged', 0)} unchanged.")
+                st.dataframe(import_preview, hide_index=True)
+                if st.button("Apply Employee Import"):
+                    set_perf_action("import_employees")
+                    changes = import_preview.loc[import_preview["Change"] != "unchanged", EMPLOYEE_COLUMNS]
+                    if changes.empty:
+                        st.info("Nothing to import.")
+                    elif storage.import_employees(dataframe_to_records(changes)):
+                        st.success(f"✅ {len(changes)} employees imported.")
+                        st.rerun()
+                    else:
+                        st.error("❌ Failed to save changes.")
 
         # Employee directory
         st.markdown("---")
         st.subheader("📋 Employee Directory")
-        name_filter = st.selectbox("🔎 Filter by Employee Name", ["(All)"] + sorted(employee_df["Name"].unique()))
-        department_filter = st.selectbox("🏢 Filter by Department", ["(All)"] + sorted(employee_df["Department"].unique()))
+        employee_filter = filter_employee(employee_index, "🔎 Filter by Employee Name", "directory_employee_search")
+        department_filter = st.selectbox("🏢 Filter by Department", ["(All)"] + employee_index["departments"])
 
         filtered_employees = employee_df.copy()
-        if name_filter != "(All)":
-            filtered_employees = filtered_employees[filtered_employees["Name"] == name_filter]
+        if employee_filter is not None:
+            filtered_employees = filtered_employees[filtered_employees["EmployeeID"] == employee_filter]
         if department_filter != "(All)":
             filtered_employees = filtered_employees[filtered_employees["Department"] == department_filter]
 
-        # Calculate attendance statistics
-        attendance_counts = attendance_df[attendance_df["DailyLog"].notna()]\
+        # Attendance statistics come from the per-month summary, one row per employee and month
+        attendance_counts = storage.load_attendance_summary()\
             .groupby("EmployeeID")\
-            .size()\
-            .reset_index(name="AttendanceCount")
-
-        # Ensure matching types for merging
-        attendance_counts["EmployeeID"] = attendance_counts["EmployeeID"].astype(str)
-        filtered_employees["EmployeeID"] = filtered_employees["EmployeeID"].astype(str)
+            .agg(
+                AttendanceCount=("DaysLogged", "sum"),
+                DaysAttended=("DaysAttended", "sum"),
+                HoursWorked=("HoursWorked", "sum"),
+                LastSeen=("LastSeen", "max")
+            )\
+            .reset_index()
 
         # Merge statistics with employee data
         employee_report = pd.merge(
@@ -558,8 +2950,63 @@ elif selected_page == "Manage User":
             attendance_counts,
             on="EmployeeID",
             how="left"
-        ).fillna({"AttendanceCount": 0})
+        ).fillna({"AttendanceCount": 0, "DaysAttended": 0, "HoursWorked": 0})
 
         employee_report["AttendanceCount"] = employee_report["AttendanceCount"].astype(int)
+        employee_report["DaysAttended"] = employee_report["DaysAttended"].astype(int)
+        employee_report["HoursWorked"] = employee_report["HoursWorked"].round(2)
+        employee_report["LastSeen"] = employee_report["LastSeen"].dt.strftime("%d/%m/%Y")
+
+        st.dataframe(employee_report.drop(columns=["DisplayName"]))
+        # Storage maintenance
+        st.markdown("---")
+        st.subheader("🗄 Storage Maintenance")
+        if st.button("Rebuild Attendance Summary"):
+            set_perf_action("rebuild_summary")
+            if storage.rebuild_attendance_summary():
+                st.success("✅ Attendance summary rebuilt.")
+            else:
+                st.error("❌ Failed to save changes.")
+
+        if STORAGE_BACKEND == "github":
+            st.markdown("📌 Rewrites attendance files stored in another format. New files are written as "
+                        f"**{ATTENDANCE_FORMAT}**; converted files keep their format on later writes.")
+            target_format = st.selectbox("Attendance File Format", ATTENDANCE_FORMATS)
+            if target_format == "parquet":
+                st.caption("Parquet needs pyarrow installed.")
+            if st.button("Convert Attendance Files"):
+                set_perf_action("convert_format")
+                converted_files, total_files = convert_attendance_files(target_format)
+                st.success(f"✅ Converted {converted_files} of {total_files} attendance files to {target_format}.")
+
+        if STORAGE_BACKEND == "sqlite":
+            st.markdown(f"📌 Replaces the local database with the data in **{REPOSITORY}**.")
+            if st.button("Import Data from GitHub"):
+                set_perf_action("import_data")
+                imported_employees, imported_records = storage.import_from(GitHubStore())
+                st.success(f"✅ Imported {imported_employees} employees and {imported_records} attendance records.")
+                st.rerun()
+        elif ATTENDANCE_STORAGE == "events":
+            if st.button("Compact Attendance Event Log"):
+                set_perf_action("compact_events")
+                folded_segments = compact_attendance_events()
+                st.success(f"✅ Folded {folded_segments} log segments into the attendance snapshot.")
+        elif ATTENDANCE_STORAGE == "monthly":
+            st.markdown(f"📌 Copies **{FILE_PATHS['attendance']}** into one file per month. Months that already have a file are kept.")
+            if st.button("Migrate Attendance to Monthly Files"):
+                set_perf_action("migrate_partitions")
+                migrated_partitions = migrate_attendance_to_partitions()
+                st.success(f"✅ Wrote {len(migrated_partitions)} monthly attendance files.")
+
+        # Performance panel
+        st.markdown("---")
+        st.subheader("⏱ Performance")
+        st.markdown(f"📌 Last {PERF_HISTORY} reruns per page and action in this server process.")
+        rerun_stats, step_stats = perf_summary()
+        if rerun_stats.empty:
+            st.info("No reruns recorded yet.")
+        else:
+            st.dataframe(rerun_stats, hide_index=True)
+            st.dataframe(step_stats, hide_index=True)
 
-        st.dataframe(employee_report.drop(columns=["DisplayName"]))
\ No newline at end of file
+finish_perf_trace()
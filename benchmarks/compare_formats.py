@@ -0,0 +1,89 @@
+"""Compare the attendance file formats on size and load time.
+
+The same generated attendance is stored in each format the app reads, and
+the Dashboard is loaded cold against it. Reported per format: bytes per
+record at rest and on the wire (the contents API adds base64 below 1 MB),
+and the time the app spent decoding the file (its json.decode or
+github.blob span) and building the frame.
+
+    python benchmarks/compare_formats.py --preset medium --repeat 5
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_github import FakeGitHub  # noqa: E402
+from generate_data import FORMATS, PRESETS  # noqa: E402
+from run_benchmarks import clear_caches, load_dataset, open_dashboard, quiet_logs  # noqa: E402
+
+ATTENDANCE_PATH = "database/EmployeeAbsent.json"
+
+
+class SpanCollector(logging.Handler):
+    """Keeps the app's performance spans for the attendance file."""
+
+    def __init__(self):
+        super().__init__()
+        self.spans = []
+
+    def emit(self, record):
+        span = json.loads(record.getMessage())
+        if span.get("event") == "span" and span.get("path") == ATTENDANCE_PATH:
+            self.spans.append(span)
+
+
+def collect_spans():
+    """Route the app's span log lines to a collector instead of stderr."""
+    logger = logging.getLogger("attendance.perf")
+    collector = SpanCollector()
+    logger.handlers = [collector]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.disabled = False
+    return collector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=PRESETS, help="named dataset size, overrides --employees/--months")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    args = parser.parse_args()
+
+    quiet_logs()
+    collector = collect_spans()
+    employee_count, months = PRESETS[args.preset] if args.preset else (args.employees, args.months)
+    print(f"{'format':<10}{'records':>9}{'B/record':>10}{'wire B/rec':>12}{'decode ms':>11}{'frame ms':>10}")
+
+    for file_format in args.formats:
+        github = FakeGitHub().start()
+        try:
+            _, attendance = load_dataset(github, employee_count, months, file_format)
+            stored = len(github.files[ATTENDANCE_PATH])
+            decode_ms, frame_ms, wire = [], [], []
+            for _ in range(args.repeat):
+                clear_caches()
+                collector.spans.clear()
+                open_dashboard(github)
+                spans = {span["span"]: span for span in collector.spans}
+                fetched = spans.get("github.blob", spans.get("github.fetch"))
+                decode_ms.append(spans["github.blob"]["ms"] if "github.blob" in spans else spans["json.decode"]["ms"])
+                frame_ms.append(spans["frame.build"]["ms"])
+                wire.append(fetched["bytes"])
+        finally:
+            github.stop()
+        count = len(attendance)
+        print(f"{file_format:<10}{count:>9}{stored / count:>10.1f}{np.median(wire) / count:>12.1f}"
+              f"{np.median(decode_ms):>11.1f}{np.median(frame_ms):>10.1f}")
+    print("\ndecode ms of files over 1 MB includes the streamed download (github.blob)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""In-process stand-in for the GitHub contents and Git data APIs.
+
+Serves files from memory over HTTP on 127.0.0.1 with the parts of the API the
+app uses: file GET (base64 content, sha, ETag / If-None-Match, ?ref=), with
+content over 1 MB left out like GitHub does, directory listing, PUT with sha
+checking (409 on a stale sha) and DELETE, plus the Git data endpoints for
+blobs, trees, commits and the branch ref. Every request can be delayed to
+simulate network latency, and requests and bytes are counted. Other
+repositories, e.g. the sites of a multi-site setup, can be served from the
+same port with add_site(). Point the app at it with the GITHUB_API_URL
+secret.
+"""
+import base64
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+INLINE_LIMIT = 1_000_000  # Bytes above which the contents API leaves the content out
+
+
+def blob_sha(content):
+    """The git blob sha of some bytes, as the contents API reports it."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class FakeGitHub:
+    """A repository's files kept in memory and served on a local port.
+
+    Every change is recorded as a commit holding a snapshot of all files,
+    so the branch head can be compared and files read at a given ref.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.files = {}
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.head = None
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0}
+        self.server = None
+        self.sites = {}
+        self.commit(dict(self.files), parent=None)
+
+    @property
+    def url(self):
+        """API root to use as GITHUB_API_URL."""
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def add_site(self, repository, latency=None):
+        """Serve another repository ("owner/name") on this port, with its own files, stats and latency."""
+        site = FakeGitHub(self.latency if latency is None else latency)
+        self.sites[repository] = site
+        return site
+
+    def commit(self, files, parent):
+        """Record files as a new commit on top of parent and move the branch to it."""
+        tree_id = f"tree{next(self.ids)}"
+        commit_id = f"commit{next(self.ids)}"
+        self.trees[tree_id] = files
+        self.commits[commit_id] = {"tree": tree_id, "parents": [parent] if parent else []}
+        self.head, self.files = commit_id, files
+        return commit_id
+
+    def put_file(self, path, content):
+        with self.lock:
+            self.commit({**self.files, path: content}, self.head)
+
+    def read_json(self, path):
+        return json.loads(self.files[path])
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def start(self):
+        handler = type("Handler", (ContentsHandler,), {"github": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ContentsHandler(BaseHTTPRequestHandler):
+    github = None
+
+    def log_message(self, *args):
+        pass
+
+    def route(self):
+        """(API area, remainder, query) of the request, e.g. ("contents", "database/x.json", {}).
+
+        Requests for a repository added with add_site() are served by that site from here on.
+        """
+        url = urlparse(self.path)
+        match = re.match(r"/repos/([^/]+/[^/]+)/(contents|git)/(.*)", url.path)
+        if not match:
+            return None, None, {}
+        self.github = self.github.sites.get(match.group(1), self.github)
+        return match.group(2), unquote(match.group(3)).rstrip("/"), parse_qs(url.query)
+
+    def read_body(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.github.lock:
+            self.github.stats["bytes_in"] += len(body)
+        return json.loads(body) if body else {}
+
+    def respond(self, status, body=None, headers=None, raw=None):
+        data = raw if raw is not None else b"" if body is None else json.dumps(body).encode()
+        time.sleep(self.github.latency)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/octet-stream" if raw is not None else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with self.github.lock:
+            self.github.stats["requests"] += 1
+            self.github.stats["bytes_out"] += len(data)
+
+    def do_GET(self):
+        area, path, query = self.route()
+        if area == "git":
+            return self.git_get(path)
+
+        github = self.github
+        files = github.trees[github.commits[query["ref"][0]]["tree"]] if "ref" in query else github.files
+        if path in files:
+            content = files[path]
+            etag = f'"{blob_sha(content)}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self.respond(304, headers={"ETag": etag})
+            inline = len(content) <= INLINE_LIMIT
+            return self.respond(200, {
+                "type": "file",
+                "path": path,
+                "sha": blob_sha(content),
+                "size": len(content),
+                "encoding": "base64" if inline else "none",
+                "content": base64.encodebytes(content).decode() if inline else "",
+            }, {"ETag": etag})
+
+        children = sorted(name for name in files if name.startswith(f"{path}/") and "/" not in name[len(path) + 1:])
+        if children:
+            return self.respond(200, [
+                {"type": "file", "name": name.rsplit("/", 1)[1], "path": name, "sha": blob_sha(files[name]), "size": len(files[name])}
+                for name in children
+            ])
+        self.respond(404, {"message": "Not Found"})
+
+    def git_get(self, path):
+        github = self.github
+        if path.startswith("ref/heads/"):
+            return self.respond(200, {"object": {"type": "commit", "sha": github.head}})
+        if path.startswith("commits/"):
+            commit = github.commits.get(path.split("/", 1)[1])
+            if commit is None:
+                return self.respond(404, {"message": "Not Found"})
+            return self.respond(200, {"sha": path.split("/", 1)[1], "tree": {"sha": commit["tree"]}})
+        if path.startswith("trees/"):
+            # A commit sha stands for its tree, like on GitHub; the listing is always the recursive one
+            tree_id = path.split("/", 1)[1]
+            tree_id = github.commits[tree_id]["tree"] if tree_id in github.commits else tree_id
+            if tree_id not in github.trees:
+                return self.respond(404, {"message": "Not Found"})
+            return self.respond(200, {"sha": tree_id, "truncated": False, "tree": [
+                {"path": name, "mode": "100644", "type": "blob", "sha": blob_sha(content), "size": len(content)}
+                for name, content in sorted(github.trees[tree_id].items())
+            ]})
+        if path.startswith("blobs/"):
+            sha = path.split("/", 1)[1]
+            content = github.blobs.get(sha)
+            if content is None:
+                content = next((data for data in github.files.values() if blob_sha(data) == sha), None)
+            if content is None:
+                return self.respond(404, {"message": "Not Found"})
+            if self.headers.get("Accept") == "application/vnd.github.raw":
+                return self.respond(200, raw=content)
+            return self.respond(200, {"sha": sha, "size": len(content), "encoding": "base64", "content": base64.encodebytes(content).decode()})
+        self.respond(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        area, path, _ = self.route()
+        body = self.read_body()
+        with self.github.lock:
+            status, reply = self.git_post(path, body) if area == "git" else (404, {"message": "Not Found"})
+        self.respond(status, reply)
+
+    def git_post(self, path, body):
+        github = self.github
+        if path == "blobs":
+            content = body["content"].encode() if body.get("encoding") == "utf-8" else base64.b64decode(body["content"])
+            github.blobs[blob_sha(content)] = content
+            return 201, {"sha": blob_sha(content)}
+        if path == "trees":
+            files = dict(github.trees[body["base_tree"]])
+            for entry in body["tree"]:
+                files[entry["path"]] = entry["content"].encode() if "content" in entry else github.blobs[entry["sha"]]
+            tree_id = f"tree{next(github.ids)}"
+            github.trees[tree_id] = files
+            return 201, {"sha": tree_id}
+        if path == "commits":
+            commit_id = f"commit{next(github.ids)}"
+            github.commits[commit_id] = {"tree": body["tree"], "parents": body["parents"]}
+            return 201, {"sha": commit_id}
+        return 404, {"message": "Not Found"}
+
+    def do_PATCH(self):
+        area, path, _ = self.route()
+        body = self.read_body()
+        github = self.github
+        status, reply = 404, {"message": "Not Found"}
+        with github.lock:
+            if area == "git" and path.startswith("refs/heads/"):
+                commit = github.commits.get(body["sha"])
+                if commit is None or (github.head not in commit["parents"] and not body.get("force")):
+                    status, reply = 422, {"message": "Update is not a fast forward"}
+                else:
+                    github.head, github.files = body["sha"], github.trees[commit["tree"]]
+                    status, reply = 200, {"object": {"type": "commit", "sha": body["sha"]}}
+        self.respond(status, reply)
+
+    def do_PUT(self):
+        _, path, _ = self.route()
+        body = self.read_body()
+        github = self.github
+        with github.lock:
+            current = github.files.get(path)
+            stale = body.get("sha") != (None if current is None else blob_sha(current))
+            if not stale:
+                content = base64.b64decode(body["content"])
+                github.commit({**github.files, path: content}, github.head)
+        if stale:
+            return self.respond(409, {"message": f"{path} does not match {body.get('sha')}"})
+        self.respond(201 if current is None else 200, {"content": {"path": path, "sha": blob_sha(content)}})
+
+    def do_DELETE(self):
+        _, path, _ = self.route()
+        body = self.read_body()
+        github = self.github
+        with github.lock:
+            current = github.files.get(path)
+            deleted = current is not None and body.get("sha") == blob_sha(current)
+            if deleted:
+                github.commit({name: data for name, data in github.files.items() if name != path}, github.head)
+        if current is None:
+            return self.respond(404, {"message": "Not Found"})
+        if not deleted:
+            return self.respond(409, {"message": f"{path} does not match {body.get('sha')}"})
+        self.respond(200, {"content": None})
@@ -0,0 +1,126 @@
+"""Generate synthetic employee and attendance data in the app's JSON format.
+
+Sizes range from a team of 10 for one month to 2,000 employees over five
+years. Records follow working days with realistic clock times, absences,
+manual entries (no ClockIn) and a still-open last day (no ClockOut).
+Attendance can be written in any of the app's ATTENDANCE_FORMATs.
+
+    python benchmarks/generate_data.py --employees 200 --months 12 --out /tmp/bench-data
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+PRESETS = {
+    "tiny": (10, 1),
+    "small": (50, 6),
+    "medium": (200, 12),
+    "large": (500, 36),
+    "huge": (2000, 60),
+}
+DEPARTMENTS = ["ENGINEERING", "DESIGN", "OPERATIONS", "FINANCE", "MARKETING", "SUPPORT"]
+FIRST_NAMES = ["Adi", "Budi", "Citra", "Dewi", "Eko", "Fajar", "Gita", "Hadi", "Indah", "Joko", "Kartika", "Lestari"]
+LAST_NAMES = ["Santoso", "Wijaya", "Pratama", "Lubis", "Saputra", "Hidayat", "Nugroho", "Siregar", "Tanujaya"]
+DAILY_LOGS = [
+    "Meeting with client", "Bug fixing on attendance page", "Code review", "Prepare monthly report",
+    "Design new onboarding flow", "Customer support tickets", "Sprint planning", "Deploy to production",
+]
+ATTENDANCE_RATE = 0.93  # Share of working days with a record
+MANUAL_ENTRY_RATE = 0.03  # Share of records without a ClockIn
+MISSING_LOG_RATE = 0.05  # Share of records without a DailyLog
+FORMATS = ["json", "columnar", "gzip", "parquet"]
+
+
+def generate_employees(count, seed=0):
+    """Employee records with unique 10-digit IDs."""
+    rng = np.random.default_rng(seed)
+    ids = rng.choice(np.arange(2_600_000_000, 2_800_000_000), size=count, replace=False)
+    names = [f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]} {i}" for i in range(count)]
+    return [
+        {"EmployeeID": str(employee_id), "Name": name, "Department": DEPARTMENTS[i % len(DEPARTMENTS)]}
+        for i, (employee_id, name) in enumerate(zip(ids, names))
+    ]
+
+
+def generate_attendance(employees, months, end=None, seed=0):
+    """Attendance records for every working day of the last ``months`` months up to ``end``."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+    days = pd.bdate_range(end - pd.DateOffset(months=months) + pd.Timedelta(days=1), end)
+    employee_ids = np.array([employee["EmployeeID"] for employee in employees])
+
+    dates = np.repeat(days, len(employee_ids))
+    ids = np.tile(employee_ids, len(days))
+    present = rng.random(len(dates)) < ATTENDANCE_RATE
+    dates, ids = dates[present], ids[present]
+    count = len(dates)
+
+    clock_in = pd.to_timedelta(np.clip(rng.normal(8.85 * 3600, 15 * 60, count), 6 * 3600, 12 * 3600).astype(int), unit="s")
+    clock_out = pd.to_timedelta(np.clip(rng.normal(17.3 * 3600, 40 * 60, count), 13 * 3600, 23 * 3600).astype(int), unit="s")
+    records = pd.DataFrame({
+        "Date": dates.strftime("%d/%m/%Y"),
+        "EmployeeID": ids,
+        "ClockIn": (pd.Timestamp(0) + clock_in).strftime("%H:%M:%S"),
+        "ClockOut": (pd.Timestamp(0) + clock_out).strftime("%H:%M:%S"),
+        "DailyLog": np.array(DAILY_LOGS, dtype=object)[rng.integers(0, len(DAILY_LOGS), count)],
+    })
+    records["ClockIn"] = records["ClockIn"].astype(object).where(rng.random(count) >= MANUAL_ENTRY_RATE, None)
+    records["DailyLog"] = records["DailyLog"].where(rng.random(count) >= MISSING_LOG_RATE, None)
+
+    # The last day is still open: clocked in, not yet out
+    still_open = dates == days[-1]
+    records.loc[still_open, ["ClockOut", "DailyLog"]] = None
+    return records.astype(object).where(records.notna(), None).to_dict(orient="records")
+
+
+def encode_records(records, file_format="json"):
+    """Records as the app's encode_github_content stores them in file_format."""
+    if file_format == "json":
+        return json.dumps(records, indent=2).encode()
+    if file_format == "parquet":
+        buffer = io.BytesIO()
+        pd.DataFrame(records).to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    rows = [[record.get(column) for column in columns] for record in records]
+    content = json.dumps([{"columns": columns}, *rows] if records else records, separators=(",", ":")).encode()
+    return gzip.compress(content, mtime=0) if file_format == "gzip" else content
+
+
+def write_dataset(directory, employees, attendance, file_format="json"):
+    """Write EmployeeData.json and EmployeeAbsent.json like the app does. Returns their sizes in bytes."""
+    os.makedirs(directory, exist_ok=True)
+    sizes = {}
+    for name, content in [("EmployeeData.json", encode_records(employees)), ("EmployeeAbsent.json", encode_records(attendance, file_format))]:
+        with open(os.path.join(directory, name), "wb") as file:
+            file.write(content)
+        sizes[name] = len(content)
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=PRESETS, help="named size, overrides --employees/--months")
+    parser.add_argument("--employees", type=int, default=10)
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=FORMATS, default="json", help="format of the attendance file")
+    parser.add_argument("--out", default="bench-data")
+    args = parser.parse_args()
+
+    employee_count, months = PRESETS[args.preset] if args.preset else (args.employees, args.months)
+    employees = generate_employees(employee_count, args.seed)
+    attendance = generate_attendance(employees, months, seed=args.seed)
+    sizes = write_dataset(args.out, employees, attendance, args.format)
+    print(f"{employee_count} employees, {len(attendance)} attendance records -> {args.out}")
+    for name, size in sizes.items():
+        print(f"  {name}: {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
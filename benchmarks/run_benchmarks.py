@@ -0,0 +1,197 @@
+"""Run scripted app scenarios against generated data and report latency and payload.
+
+The app is driven with Streamlit's AppTest against a FakeGitHub holding a
+generated dataset, so nothing leaves the machine. For every scenario the
+wall time of each run is reported as percentiles, together with the API
+requests and bytes it cost.
+
+    python benchmarks/run_benchmarks.py --preset medium --latency 80 --repeat 20
+
+Clock-in and clock-out include the write queue's WRITE_COALESCE_WINDOW.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+import streamlit as st
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_github import FakeGitHub  # noqa: E402
+from generate_data import FORMATS, PRESETS, encode_records, generate_attendance, generate_employees  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app.py")
+TIMEZONE = "Asia/Jakarta"
+DASHBOARD_PIN = "357101"
+DEFERRED_DOWNLOADS = {}  # deferred_file_id -> data callable of every download button rendered
+SCENARIOS = ["page_load_cold", "page_load_warm", "clock_in", "clock_out_with_log", "dashboard_filter", "excel_export", "batch_signing"]
+
+
+def load_dataset(github, employee_count, months, file_format="json"):
+    """Put a generated dataset into the fake repository, ending yesterday so today is free for clock-ins."""
+    yesterday = datetime.now(pytz.timezone(TIMEZONE)).date() - timedelta(days=1)
+    employees = generate_employees(employee_count)
+    attendance = generate_attendance(employees, months, end=yesterday)
+    github.put_file("database/EmployeeData.json", encode_records(employees))
+    github.put_file("database/EmployeeAbsent.json", encode_records(attendance, file_format))
+    return employees, attendance
+
+
+def quiet_logs():
+    """Keep the report readable: drop the app's per-span log lines and the warnings Streamlit
+    gives for every cache access made outside a script run."""
+    for name in [
+        "attendance.perf",
+        "streamlit.runtime.caching.cache_data_api",
+        "streamlit.runtime.scriptrunner_utils.script_run_context",
+    ]:
+        logging.getLogger(name).disabled = True
+
+
+def record_deferred_downloads():
+    """Keep the data callables of download buttons, which AppTest cannot click."""
+    add_deferred = MediaFileManager.add_deferred
+
+    def recording_add_deferred(self, data_callable, *args, **kwargs):
+        file_id = add_deferred(self, data_callable, *args, **kwargs)
+        DEFERRED_DOWNLOADS[file_id] = data_callable
+        return file_id
+
+    MediaFileManager.add_deferred = recording_add_deferred
+
+
+def new_session(github):
+    """A fresh browser session of the app talking to the fake API."""
+    app = AppTest.from_file(APP_PATH, default_timeout=600)
+    app.secrets["GITHUB_TOKEN"] = "benchmark"
+    app.secrets["GITHUB_API_URL"] = github.url
+    return app
+
+
+def widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+
+def measure(github, samples, action):
+    """Time one run of action and record the API traffic it caused."""
+    github.reset_stats()
+    start = time.perf_counter()
+    app = action()
+    elapsed = time.perf_counter() - start
+    if app is not None and len(app.exception):
+        raise RuntimeError(app.exception[0].value)
+    samples.append((elapsed, dict(github.stats)))
+
+
+def clear_caches():
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def open_dashboard(github):
+    app = new_session(github)
+    app.run()
+    widget(app.sidebar.selectbox, "Select Page").set_value("Dashboard").run()
+    widget(app.text_input, "Enter PIN to access Dashboard:").input(DASHBOARD_PIN).run()
+    return app.run()
+
+
+def run_scenario(name, github, employees, repeat):
+    samples = []
+    if name == "page_load_cold":
+        for _ in range(repeat):
+            clear_caches()
+            measure(github, samples, lambda: new_session(github).run())
+
+    elif name == "page_load_warm":
+        new_session(github).run()
+        for _ in range(repeat):
+            measure(github, samples, lambda: new_session(github).run())
+
+    elif name in ("clock_in", "clock_out_with_log"):
+        app = new_session(github).run()
+        for employee in employees[:min(repeat, len(employees))]:
+            widget(app.text_input, "🔎 Search Employee").input(employee["EmployeeID"]).run()
+            widget(app.selectbox, "Select Employee").set_value(f"{employee['EmployeeID']} - {employee['Name']}").run()
+            if name == "clock_in":
+                measure(github, samples, lambda: widget(app.button, "✅ Clock In").click().run())
+            else:
+                # Clock in first unless the clock_in scenario already did
+                widget(app.button, "✅ Clock In").click().run()
+
+                def clock_out():
+                    widget(app.button, "🔚 Clock Out").click().run()
+                    widget(app.text_area, "Daily Log").input("Benchmark daily log")
+                    return widget(app.button, "Submit Clock Out").click().run()
+                measure(github, samples, clock_out)
+
+    elif name == "dashboard_filter":
+        app = open_dashboard(github)
+        today = datetime.now(pytz.timezone(TIMEZONE)).date()
+        for offset in range(repeat):
+            period = (today - timedelta(days=30 + offset), today - timedelta(days=offset))
+            measure(github, samples, lambda: widget(app.date_input, "📆 Filter by Date Range").set_value(period).run())
+
+    elif name == "excel_export":
+        app = open_dashboard(github)
+        build_workbook = DEFERRED_DOWNLOADS[app.get("download_button")[0].proto.deferred_file_id]
+        for _ in range(repeat):
+            st.cache_data.clear()
+            workbook = []
+            measure(github, samples, lambda: workbook.append(build_workbook()))
+            # The workbook is what the browser downloads
+            samples[-1][1]["bytes_out"] += len(workbook[-1])
+
+    elif name == "batch_signing":
+        app = open_dashboard(github)
+        widget(app.selectbox, "Select Period Type").set_value("Last Month").run()
+        for _ in range(repeat):
+            measure(github, samples, lambda: widget(app.button, "Add Signatures for Selected Period").click().run())
+
+    return samples
+
+
+def report(name, samples):
+    times = np.array([elapsed for elapsed, _ in samples]) * 1000
+    requests = np.mean([stats["requests"] for _, stats in samples])
+    bytes_out = np.mean([stats["bytes_out"] for _, stats in samples]) / 1024
+    bytes_in = np.mean([stats["bytes_in"] for _, stats in samples]) / 1024
+    p50, p95 = np.percentile(times, [50, 95])
+    print(f"{name:<20}{len(samples):>5}{p50:>10.0f}{p95:>10.0f}{times.max():>10.0f}{requests:>10.1f}{bytes_out:>12.1f}{bytes_in:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=PRESETS, help="named dataset size, overrides --employees/--months")
+    parser.add_argument("--employees", type=int, default=10)
+    parser.add_argument("--months", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds added to every API response")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--format", choices=FORMATS, default="json", help="format the attendance file starts in")
+    args = parser.parse_args()
+
+    quiet_logs()
+    record_deferred_downloads()
+    employee_count, months = PRESETS[args.preset] if args.preset else (args.employees, args.months)
+    github = FakeGitHub(latency=args.latency / 1000).start()
+    employees, attendance = load_dataset(github, employee_count, months, args.format)
+    size = len(github.files["database/EmployeeAbsent.json"]) / 1e6
+    print(f"{employee_count} employees, {len(attendance)} records ({size:.1f} MB), {args.latency:g} ms latency\n")
+    print(f"{'scenario':<20}{'runs':>5}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'requests':>10}{'KB down':>12}{'KB up':>10}")
+
+    try:
+        for name in args.scenarios:
+            report(name, run_scenario(name, github, employees, args.repeat))
+    finally:
+        github.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Round trips of app.parse_json_stream over arbitrary chunk boundaries.
+
+app.py runs the Streamlit page when imported, so the parser is compiled on
+its own from the source.
+
+    python -m pytest tests
+"""
+import ast
+import codecs
+import json
+import os
+import random
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def load_app_function(name):
+    """Compile one top-level function of app.py with the modules it uses."""
+    with open(APP_PATH, encoding="utf-8") as file:
+        module = ast.parse(file.read(), APP_PATH)
+    function = next(node for node in module.body if isinstance(node, ast.FunctionDef) and node.name == name)
+    namespace = {"codecs": codecs, "json": json}
+    exec(compile(ast.Module(body=[function], type_ignores=[]), APP_PATH, "exec"), namespace)
+    return namespace[name]
+
+
+parse_json_stream = load_app_function("parse_json_stream")
+
+DOCUMENTS = [
+    [],
+    [7.25, 1e5, -0.5, 12345, 1.5e-3, 0, -7],
+    [True, False, None, "x,y", "a]b", "é ü 日本", {"nested": [1, [2.5, {"k": "]"}]]}],
+    [{"Date": "01/10/2026", "EmployeeID": "2602069620", "HoursWorked": 7.987654321, "DailyLog": None}] * 40,
+    [{"columns": ["EmployeeID", "HoursWorked"]}, ["1", 8.25], ["2", 1e-7], ["3", 100.0]],
+    {"columns": ["a"], "rows": [[1.5]]},
+    12.5,
+]
+
+
+def chunked(content, sizes):
+    position = 0
+    for size in sizes:
+        if position >= len(content):
+            return
+        yield content[position:position + size]
+        position += size
+    if position < len(content):
+        yield content[position:]
+
+
+@pytest.mark.parametrize("separators", [None, (",", ":")])
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_random_chunking_round_trip(document, separators):
+    content = json.dumps(document, indent=None if separators else 2, separators=separators, ensure_ascii=False).encode()
+    generator = random.Random(len(content))
+    for _ in range(200):
+        sizes = [generator.randint(1, 8) for _ in range(len(content))]
+        assert parse_json_stream(chunked(content, sizes)) == document
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_every_split_point(document):
+    content = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+    for split in range(1, len(content)):
+        assert parse_json_stream([content[:split], content[split:]]) == document
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    ([b"[7.", b"25]"], [7.25]),
+    ([b"[1e", b"5]"], [1e5]),
+    ([b"[1E", b"-2]"], [1e-2]),
+    ([b"[1", b"2, 3", b"4]"], [12, 34]),
+    ([b"[-", b"3]"], [-3]),
+])
+def test_number_cut_by_chunk(chunks, expected):
+    assert parse_json_stream(chunks) == expected
+
+
+@pytest.mark.parametrize("content", [b"[1, 2", b'[{"a": 1}', b"[7."])
+def test_malformed_array(content):
+    with pytest.raises(ValueError):
+        parse_json_stream([content[:3], content[3:]])